@@ -96,6 +96,40 @@ class AIProcessingPipeline:
         
         logger.info("AI Processing Pipeline initialized successfully")
     
+    def _build_chunks(self, document: Document) -> List[LangChainDocument]:
+        """Split a document into LangChain documents carrying its metadata."""
+        chunks = self.text_splitter.split_text(document.content)
+        
+        langchain_docs = []
+        for i, chunk in enumerate(chunks):
+            metadata = {
+                'document_id': document.id,
+                'chunk_id': i,
+                'title': document.title,
+                'source_type': document.source_type,
+                'source_url': document.source_url,
+                'created_at': document.created_at.isoformat() if document.created_at else None
+            }
+            
+            langchain_doc = LangChainDocument(
+                page_content=chunk,
+                metadata=metadata
+            )
+            langchain_docs.append(langchain_doc)
+        
+        return langchain_docs
+    
+    def _mark_processed(self, document: Document):
+        """Add a summary if missing and mark the document as completed."""
+        # Generate summary if LLM is available
+        summary = self.generate_summary(document.content) if self.llm else None
+        if summary and not document.summary:
+            document.summary = summary
+        
+        # Update document status
+        document.update_processing_status('completed')
+        document.vector_id = f"user_{document.user_id}_doc_{document.id}"
+    
     def process_document(self, document: Document) -> bool:
         """
         Process a document through the AI pipeline.
@@ -111,25 +145,7 @@ class AIProcessingPipeline:
             document.update_processing_status('processing')
             
             # Split document into chunks
-            chunks = self.text_splitter.split_text(document.content)
-            
-            # Create LangChain documents
-            langchain_docs = []
-            for i, chunk in enumerate(chunks):
-                metadata = {
-                    'document_id': document.id,
-                    'chunk_id': i,
-                    'title': document.title,
-                    'source_type': document.source_type,
-                    'source_url': document.source_url,
-                    'created_at': document.created_at.isoformat() if document.created_at else None
-                }
-                
-                langchain_doc = LangChainDocument(
-                    page_content=chunk,
-                    metadata=metadata
-                )
-                langchain_docs.append(langchain_doc)
+            langchain_docs = self._build_chunks(document)
             
             # Generate and store embeddings
             success = self.vector_store_manager.add_documents_to_user_store(
@@ -138,15 +154,7 @@ class AIProcessingPipeline:
             )
             
             if success:
-                # Generate summary if LLM is available
-                summary = self.generate_summary(document.content) if self.llm else None
-                if summary and not document.summary:
-                    document.summary = summary
-                
-                # Update document status
-                document.update_processing_status('completed')
-                document.vector_id = f"user_{document.user_id}_doc_{document.id}"
-                
+                self._mark_processed(document)
                 logger.info(f"Successfully processed document {document.id}")
                 return True
             else:
@@ -158,6 +166,54 @@ class AIProcessingPipeline:
             document.update_processing_status('failed', str(e))
             return False
     
+    def process_documents(self, documents: List[Document]) -> int:
+        """
+        Process several documents through the AI pipeline in one batch.
+        
+        Chunks of all documents belonging to the same user are embedded with a
+        single embedding call and written to that user's store with one save.
+        
+        Args:
+            documents: Document model instances to process
+            
+        Returns:
+            int: Number of documents processed successfully
+        """
+        by_user = {}
+        for document in documents:
+            try:
+                document.update_processing_status('processing')
+                by_user.setdefault(document.user_id, []).append(
+                    (document, self._build_chunks(document))
+                )
+            except Exception as e:
+                logger.error(f"Error processing document {document.id}: {e}")
+                document.update_processing_status('failed', str(e))
+        
+        processed = 0
+        for user_id, entries in by_user.items():
+            langchain_docs = [chunk for _, chunks in entries for chunk in chunks]
+            
+            try:
+                success = self.vector_store_manager.add_documents_to_user_store(
+                    str(user_id),
+                    langchain_docs
+                )
+                error = None if success else 'Failed to generate embeddings'
+            except Exception as e:
+                success, error = False, str(e)
+            
+            for document, _ in entries:
+                if success:
+                    self._mark_processed(document)
+                    processed += 1
+                else:
+                    logger.error(f"Error processing document {document.id}: {error}")
+                    document.update_processing_status('failed', error)
+        
+        logger.info(f"Successfully processed {processed}/{len(documents)} documents")
+        return processed
+    
     def remove_document(self, document: Document) -> bool:
         """
         Remove a document from the vector store.
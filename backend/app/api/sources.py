@@ -10,7 +10,6 @@ from app import db
 from app.models import Source
 from app.utils.decorators import validate_json, require_user_ownership
 from app.utils.validators import validate_url
-from app.crawlers.scheduler import CrawlerScheduler
 
 bp = Blueprint('sources', __name__)
 
@@ -385,6 +384,8 @@ def get_crawler_status():
         
         # Get current jobs
         jobs = crawler_scheduler.get_job_status()
+        for job in jobs:
+            job['next_run_time'] = job['next_run_time'].isoformat() if job['next_run_time'] else None
         
         # Get proxy status if available
         proxy_stats = None
@@ -456,7 +457,9 @@ def init_crawler_scheduler(app):
     global crawler_scheduler
     
     try:
-        crawler_scheduler = CrawlerScheduler(app.config)
+        # Imported here so registering the blueprint doesn't load the crawler stack
+        from app.crawlers.scheduler import CrawlerScheduler
+        crawler_scheduler = CrawlerScheduler(app.config, app=app)
         app.logger.info("Crawler scheduler initialized")
         
         # Start scheduler if not in testing mode
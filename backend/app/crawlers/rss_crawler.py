@@ -2,6 +2,7 @@
 RSS Feed Crawler for automated news collection.
 """
 import logging
+import threading
 import time
 from datetime import datetime, timezone
 from typing import List, Dict, Optional, Tuple
@@ -13,7 +14,7 @@ import hashlib
 import re
 
 from app import db
-from app.models import Document, Source
+from app.models import Document, Source, CrawlerMetric
 from app.utils.validators import sanitize_html_content, validate_url
 from app.services.email_service import EmailService
 
@@ -25,12 +26,13 @@ class RSSCrawler:
     RSS Feed Crawler with intelligent content extraction and processing.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, http_session: Optional[requests.Session] = None):
         """
         Initialize RSS Crawler.
         
         Args:
             config: Configuration dictionary with crawler settings
+            http_session: Optional shared requests session (connection pooling)
         """
         self.config = config or {}
         self.user_agent = self.config.get(
@@ -42,6 +44,12 @@ class RSSCrawler:
         self.max_retries = 3
         self.email_service = EmailService(config)
         self._ai_pipeline = None  # Lazy initialization
+        self._ai_lock = threading.Lock()  # Crawls may run in worker threads
+        self._feed_sizes = {}  # url -> size of last full feed body (for bytes_saved)
+        self._feed_validators = {}  # url -> conditional GET headers from the last full response
+        
+        # Reuse keep-alive connections across feeds and article pages
+        self.session = http_session or requests.Session()
         
         # Headers for HTTP requests
         self.headers = {
@@ -63,34 +71,38 @@ class RSSCrawler:
         Returns:
             LangChainService instance or None if initialization fails
         """
-        if self._ai_pipeline is None:
-            try:
-                from app.ai.langchain_service import LangChainService
+        with self._ai_lock:
+            if self._ai_pipeline is None:
+                try:
+                    from app.ai.langchain_service import LangChainService
                 
-                # Use configuration from crawler config or defaults
-                ai_config = {
-                    'EMBEDDINGS_MODEL': self.config.get('EMBEDDINGS_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'),
-                    'VECTOR_STORE_PATH': self.config.get('VECTOR_STORE_PATH', 'data/vector_stores'),
-                    'LLM_MODEL': self.config.get('LLM_MODEL', 'qwen3:4b'),
-                    'OLLAMA_BASE_URL': self.config.get('OLLAMA_BASE_URL', 'http://localhost:11434'),
-                    'RERANKER_MODEL': self.config.get('RERANKER_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
-                }
+                    # Use configuration from crawler config or defaults
+                    ai_config = {
+                        'EMBEDDINGS_MODEL': self.config.get('EMBEDDINGS_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'),
+                        'VECTOR_STORE_PATH': self.config.get('VECTOR_STORE_PATH', 'data/vector_stores'),
+                        'LLM_MODEL': self.config.get('LLM_MODEL', 'qwen3:4b'),
+                        'OLLAMA_BASE_URL': self.config.get('OLLAMA_BASE_URL', 'http://localhost:11434'),
+                        'RERANKER_MODEL': self.config.get('RERANKER_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+                    }
                 
-                self._ai_pipeline = LangChainService(config=ai_config)
-                logger.info("AI processing pipeline initialized for crawler")
+                    self._ai_pipeline = LangChainService(config=ai_config)
+                    logger.info("AI processing pipeline initialized for crawler")
                 
-            except Exception as e:
-                logger.error(f"Failed to initialize AI pipeline for crawler: {e}")
-                self._ai_pipeline = None
+                except Exception as e:
+                    logger.error(f"Failed to initialize AI pipeline for crawler: {e}")
+                    self._ai_pipeline = None
         
         return self._ai_pipeline
     
-    def crawl_source(self, source: Source) -> Tuple[bool, int, Optional[str]]:
+    def crawl_source(self, source: Source, bulk: bool = False) -> Tuple[bool, int, Optional[str]]:
         """
         Crawl a single RSS source and extract articles.
         
         Args:
             source: Source model instance to crawl
+            bulk: Collect all new articles first and persist them together with
+                the source statistics in a single transaction, instead of
+                committing once per article
             
         Returns:
             Tuple of (success, articles_count, error_message)
@@ -106,14 +118,23 @@ class RSSCrawler:
                 return False, 0, error_msg
             
             # Fetch and parse RSS feed
-            feed_data = self._fetch_rss_feed(source.url)
+            metrics = {'conditional_hits': 0, 'conditional_misses': 0, 'bytes_saved': 0}
+            feed_data = self._fetch_rss_feed(source.url, metrics)
+            CrawlerMetric.record(source.id, **metrics)
+            
+            if metrics['conditional_hits'] and not feed_data:
+                # 304 Not Modified: nothing new, but the crawl itself succeeded
+                source.update_crawl_stats(success=True, articles_count=0, error=None)
+                return True, 0, None
+            
             if not feed_data:
                 error_msg = "Failed to fetch RSS feed"
                 logger.error(error_msg)
                 return False, 0, error_msg
             
-            # Parse feed
-            feed = feedparser.parse(feed_data)
+            # Parse feed; feedparser's own HTML sanitizing is skipped because every
+            # field we keep goes through sanitize_html_content / _clean_text
+            feed = feedparser.parse(feed_data, sanitize_html=False, resolve_relative_uris=False)
             if feed.bozo and not feed.entries:
                 error_msg = f"Invalid RSS feed format: {getattr(feed, 'bozo_exception', 'Unknown error')}"
                 logger.error(error_msg)
@@ -122,10 +143,11 @@ class RSSCrawler:
             # Process entries
             articles_processed = 0
             max_articles = source.crawl_settings.get('max_articles_per_crawl', 5)
+            pending = [] if bulk else None
             
             for entry in feed.entries[:max_articles]:
                 try:
-                    if self._process_rss_entry(entry, source):
+                    if self._process_rss_entry(entry, source, pending):
                         articles_processed += 1
                     
                     # Rate limiting
@@ -136,13 +158,25 @@ class RSSCrawler:
                     logger.error(f"Error processing RSS entry: {e}")
                     continue
             
-            # Update source statistics
+            # Bulk mode: write all collected articles now (no network I/O while
+            # the write transaction is open)
+            documents = []
+            if pending:
+                documents = [Document.create_document(commit=False, **fields) for fields in pending]
+            
+            # Update source statistics (commits any pending documents as well)
             source.update_crawl_stats(
                 success=True,
                 articles_count=articles_processed,
                 error=None
             )
             
+            if documents:
+                for document in documents:
+                    self._index_document(document)
+                    logger.info(f"Created document: {document.title}")
+                db.session.commit()
+            
             # Send email notification if configured and articles were found
             if articles_processed > 0 and source.crawl_settings.get('email_notifications', True):
                 self._send_notification_email(source, articles_processed)
@@ -153,15 +187,19 @@ class RSSCrawler:
         except Exception as e:
             error_msg = f"Crawling failed for {source.name}: {str(e)}"
             logger.error(error_msg)
+            if bulk:
+                db.session.rollback()
             source.update_crawl_stats(success=False, error=error_msg)
             return False, 0, error_msg
     
-    def _fetch_rss_feed(self, url: str) -> Optional[str]:
+    def _fetch_rss_feed(self, url: str, metrics: Optional[Dict] = None) -> Optional[str]:
         """
         Fetch RSS feed content with retries and error handling.
         
         Args:
             url: RSS feed URL
+            metrics: Optional dict whose conditional_hits / conditional_misses /
+                bytes_saved counters are incremented
             
         Returns:
             Feed content as string or None if failed
@@ -170,9 +208,13 @@ class RSSCrawler:
             try:
                 logger.debug(f"Fetching RSS feed: {url} (attempt {attempt + 1})")
                 
-                response = requests.get(
+                # Ask the server to answer 304 if the feed hasn't changed
+                validators = self._feed_validators.get(url)
+                headers = {**self.headers, **(validators or {})}
+                
+                response = self.session.get(
                     url,
-                    headers=self.headers,
+                    headers=headers,
                     timeout=self.timeout,
                     allow_redirects=True,
                     verify=True
@@ -180,9 +222,17 @@ class RSSCrawler:
                 
                 # Check response status
                 if response.status_code == 200:
+                    self._feed_sizes[url] = len(response.content)
+                    self._remember_validators(url, response)
+                    # Only a request that carried validators can miss
+                    if metrics is not None and validators:
+                        metrics['conditional_misses'] += 1
                     return response.text
                 elif response.status_code == 304:
                     logger.info(f"RSS feed not modified: {url}")
+                    if metrics is not None:
+                        metrics['conditional_hits'] += 1
+                        metrics['bytes_saved'] += self._feed_sizes.get(url, 0)
                     return None
                 elif response.status_code in [403, 429]:
                     wait_time = (attempt + 1) * 5  # Exponential backoff
@@ -208,13 +258,28 @@ class RSSCrawler:
         
         return None
     
-    def _process_rss_entry(self, entry, source: Source) -> bool:
+    def _remember_validators(self, url: str, response: requests.Response):
+        """Store the ETag / Last-Modified of a full response for the next conditional GET."""
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        
+        if validators:
+            self._feed_validators[url] = validators
+        else:
+            self._feed_validators.pop(url, None)
+    
+    def _process_rss_entry(self, entry, source: Source, pending: Optional[List[Dict]] = None) -> bool:
         """
         Process a single RSS entry and create document.
         
         Args:
             entry: RSS feed entry from feedparser
             source: Source model instance
+            pending: Optional list collecting document fields for bulk
+                creation; when given, no document is written here
             
         Returns:
             True if article was processed and created, False otherwise
@@ -253,35 +318,30 @@ class RSSCrawler:
             # Generate tags
             tags = self._generate_tags(entry, source, title, content)
             
-            # Create document
-            document = Document.create_document(
-                user_id=source.user_id,
-                title=title,
-                content=content,
-                summary=summary,
-                source_url=link,
-                source_type='rss',
-                source_name=source.name,
-                author=author,
-                published_date=published_date,
-                tags=tags,
-                vector_id=f"rss_{source.id}_{url_hash}"
-            )
+            fields = {
+                'user_id': source.user_id,
+                'title': title,
+                'content': content,
+                'summary': summary,
+                'source_url': link,
+                'source_type': 'rss',
+                'source_name': source.name,
+                'author': author,
+                'published_date': published_date,
+                'tags': tags,
+                'vector_id': f"rss_{source.id}_{url_hash}",
+            }
             
-            # Process document through AI pipeline for semantic search
-            try:
-                ai_pipeline = self._get_ai_pipeline()
-                if ai_pipeline:
-                    success = ai_pipeline.process_document(document)
-                    if success:
-                        logger.info(f"Document processed through AI pipeline: {title}")
-                    else:
-                        logger.warning(f"Failed to process document through AI pipeline: {title}")
-                else:
-                    logger.warning("AI pipeline not available, document not processed for semantic search")
-            except Exception as e:
-                logger.error(f"Error processing document through AI pipeline: {e}")
-                # Don't fail the entire crawling process if AI processing fails
+            if pending is not None:
+                # Feeds occasionally repeat an entry; keep the first one
+                if any(item['vector_id'] == fields['vector_id'] for item in pending):
+                    return False
+                pending.append(fields)
+                return True
+            
+            # Create document
+            document = Document.create_document(**fields)
+            self._index_document(document)
             
             logger.info(f"Created document: {title}")
             return True
@@ -290,6 +350,42 @@ class RSSCrawler:
             logger.error(f"Error processing RSS entry: {e}")
             return False
     
+    def _index_document(self, document: Document):
+        """Process document through AI pipeline for semantic search."""
+        try:
+            ai_pipeline = self._get_ai_pipeline()
+            if ai_pipeline:
+                # The vector store is not thread-safe; serialize writes
+                with self._ai_lock:
+                    success = ai_pipeline.process_document(document)
+                if success:
+                    logger.info(f"Document processed through AI pipeline: {document.title}")
+                else:
+                    logger.warning(f"Failed to process document through AI pipeline: {document.title}")
+            else:
+                logger.warning("AI pipeline not available, document not processed for semantic search")
+        except Exception as e:
+            logger.error(f"Error processing document through AI pipeline: {e}")
+            # Don't fail the entire crawling process if AI processing fails
+    
+    def index_documents(self, documents: List[Document]) -> Optional[int]:
+        """
+        Process several existing documents through the AI pipeline in one batch.
+        
+        Args:
+            documents: Document model instances to index
+            
+        Returns:
+            Number of documents indexed, or None if the AI pipeline is unavailable
+        """
+        ai_pipeline = self._get_ai_pipeline()
+        if not ai_pipeline:
+            return None
+        
+        # The vector store is not thread-safe; serialize writes
+        with self._ai_lock:
+            return ai_pipeline.process_documents(documents)
+    
     def _extract_content(self, entry, link: str, source: Source) -> Optional[str]:
         """
         Extract full content from RSS entry, with fallback to web scraping.
@@ -345,7 +441,7 @@ class RSSCrawler:
             Scraped content or None
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 headers=self.headers,
                 timeout=self.timeout,
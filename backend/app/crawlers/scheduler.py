@@ -2,18 +2,24 @@
 Intelligent crawler scheduler for automated news collection.
 """
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.events import (
+    EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_SCHEDULER_SHUTDOWN,
+    EVENT_SCHEDULER_START, EVENT_SCHEDULER_PAUSED, EVENT_SCHEDULER_RESUMED,
+    EVENT_JOB_ADDED, EVENT_JOB_REMOVED, EVENT_ALL_JOBS_REMOVED
+)
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
 import pytz
 
 from app import db
-from app.models import Source
+from app.models import Source, Document
 from app.crawlers.rss_crawler import RSSCrawler
 from app.crawlers.web_scraper import WebScraper
 from app.services.email_service import EmailService
@@ -26,14 +32,16 @@ class CrawlerScheduler:
     Intelligent scheduler for automated crawling tasks with load balancing and error handling.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, app=None):
         """
         Initialize Crawler Scheduler.
         
         Args:
             config: Configuration dictionary with scheduler settings
+            app: Flask application; jobs that touch the database run in its context
         """
         self.config = config or {}
+        self.app = app
         
         # Initialize crawlers
         self.rss_crawler = RSSCrawler(config)
@@ -44,6 +52,7 @@ class CrawlerScheduler:
         self.max_workers = self.config.get('SCHEDULER_MAX_WORKERS', 2)
         self.coalesce = self.config.get('SCHEDULER_COALESCE', True)
         self.max_instances = self.config.get('SCHEDULER_MAX_INSTANCES', 2)
+        self.stats_ttl = self.config.get('SCHEDULER_STATS_TTL', 5)  # seconds
         
         # Job store configuration (use SQLite by default)
         database_url = self.config.get('DATABASE_URL', 'sqlite:///scheduler.db')
@@ -77,6 +86,12 @@ class CrawlerScheduler:
             'total_articles_crawled': 0,
         }
         
+        # Short-lived cache for get_scheduler_stats: (expires_at, stats)
+        self._stats_cache = None
+        
+        # Set once the scheduler shuts down so callers can block on it
+        self._stopped = threading.Event()
+        
         # Setup event listeners
         self._setup_event_listeners()
         
@@ -86,6 +101,7 @@ class CrawlerScheduler:
         """Start the scheduler."""
         try:
             if not self.scheduler.running:
+                self._stopped.clear()
                 self.scheduler.start()
                 logger.info("Crawler Scheduler started")
                 
@@ -110,6 +126,24 @@ class CrawlerScheduler:
                 logger.warning("Scheduler is not running")
         except Exception as e:
             logger.error(f"Failed to stop scheduler: {e}")
+        finally:
+            self._stopped.set()
+    
+    def wait_until_stopped(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the scheduler shuts down.
+        
+        Args:
+            timeout: Optional maximum number of seconds to wait
+            
+        Returns:
+            True if the scheduler has stopped, False if the timeout expired
+        """
+        return self._stopped.wait(timeout)
+    
+    def request_stop(self):
+        """Wake up any caller blocked in wait_until_stopped (signal-safe)."""
+        self._stopped.set()
     
     def _setup_event_listeners(self):
         """Setup event listeners for job monitoring."""
@@ -136,9 +170,22 @@ class CrawlerScheduler:
             self.stats['jobs_missed'] += 1
             logger.warning(f"Job missed: {event.job_id}")
         
+        def scheduler_shutdown_listener(event):
+            self._stopped.set()
+        
+        def state_changed_listener(event):
+            # is_running / total_jobs in the cached stats are now stale
+            self._stats_cache = None
+        
         self.scheduler.add_listener(job_executed_listener, EVENT_JOB_EXECUTED)
         self.scheduler.add_listener(job_error_listener, EVENT_JOB_ERROR)
         self.scheduler.add_listener(job_missed_listener, EVENT_JOB_MISSED)
+        self.scheduler.add_listener(scheduler_shutdown_listener, EVENT_SCHEDULER_SHUTDOWN)
+        self.scheduler.add_listener(
+            state_changed_listener,
+            EVENT_SCHEDULER_START | EVENT_SCHEDULER_SHUTDOWN | EVENT_SCHEDULER_PAUSED |
+            EVENT_SCHEDULER_RESUMED | EVENT_JOB_ADDED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED
+        )
     
     def _schedule_existing_sources(self):
         """Schedule crawling jobs for all existing active sources."""
@@ -167,6 +214,17 @@ class CrawlerScheduler:
             max_instances=1
         )
         
+        # Index documents still pending AI processing (every 5 minutes)
+        self.scheduler.add_job(
+            func=self._process_pending_documents_task,
+            trigger=IntervalTrigger(minutes=5),
+            id='process_pending_documents',
+            name='Process Pending Documents',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1
+        )
+        
         # Database cleanup (daily at 2 AM)
         # self.scheduler.add_job(
         #     func=self._database_cleanup_task,
@@ -377,6 +435,43 @@ class CrawlerScheduler:
         except Exception as e:
             logger.error(f"Proxy health check task failed: {e}")
     
+    def _process_pending_documents_task(self, batch_size: int = 50, min_age_minutes: int = 10):
+        """
+        Periodic task that runs pending documents through the AI pipeline.
+        
+        Picks up documents created without inline processing (e.g. demo data
+        seeded by init_database.py). Only documents older than min_age_minutes
+        are considered so uploads still being processed inline are not indexed twice.
+        Documents are marked failed when no AI pipeline is available so the
+        same batch is not retried on every run.
+        """
+        if self.app is None:
+            logger.warning("No Flask app given to the scheduler; skipping pending document processing")
+            return
+        
+        with self.app.app_context():
+            try:
+                cutoff = datetime.utcnow() - timedelta(minutes=min_age_minutes)
+                pending = Document.query.filter(
+                    Document.processing_status == 'pending',
+                    Document.created_at < cutoff
+                ).order_by(Document.id).limit(batch_size).all()
+                
+                if not pending:
+                    return
+                
+                logger.info(f"Processing {len(pending)} pending documents")
+                processed = self.rss_crawler.index_documents(pending)
+                if processed is None:
+                    logger.warning("AI pipeline not available, marking pending documents failed")
+                    for document in pending:
+                        document.update_processing_status('failed', 'AI pipeline not available')
+                db.session.commit()
+                
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Pending document processing task failed: {e}")
+    
     def _database_cleanup_task(self):
         """Periodic database cleanup task."""
         try:
@@ -397,9 +492,8 @@ class CrawlerScheduler:
             logger.info(f"Cleaned up {removed_tags} unused tags")
             
             # Optimize database (SQLite specific)
-            if 'sqlite' in self.config.get('DATABASE_URL', ''):
-                db.engine.execute('VACUUM')
-                logger.info("Database vacuumed")
+            from app.utils.database import optimize_database
+            optimize_database()
             
         except Exception as e:
             logger.error(f"Database cleanup task failed: {e}")
@@ -536,7 +630,7 @@ class CrawlerScheduler:
         Get status of all scheduled jobs.
         
         Returns:
-            List of job status dictionaries
+            List of job status dictionaries (``next_run_time`` is a datetime or None)
         """
         jobs = []
         
@@ -544,7 +638,7 @@ class CrawlerScheduler:
             jobs.append({
                 'id': job.id,
                 'name': job.name,
-                'next_run_time': job.next_run_time.isoformat() if job.next_run_time else None,
+                'next_run_time': job.next_run_time,
                 'trigger': str(job.trigger),
                 'max_instances': job.max_instances,
                 'coalesce': job.coalesce,
@@ -556,9 +650,18 @@ class CrawlerScheduler:
         """
         Get scheduler statistics.
         
+        Results are cached for ``SCHEDULER_STATS_TTL`` seconds so frequent
+        status polling doesn't walk the job store every time. The cache is
+        dropped whenever the scheduler starts or stops or a job is added or
+        removed, so ``is_running`` and ``total_jobs`` are never stale.
+        
         Returns:
             Dictionary with scheduler statistics
         """
+        now = time.monotonic()
+        if self._stats_cache and self._stats_cache[0] > now:
+            return self._stats_cache[1].copy()
+        
         stats = self.stats.copy()
         stats.update({
             'is_running': self.scheduler.running,
@@ -567,7 +670,8 @@ class CrawlerScheduler:
             'last_execution': stats['last_execution'].isoformat() if stats['last_execution'] else None,
         })
         
-        return stats
+        self._stats_cache = (now + self.stats_ttl, stats)
+        return stats.copy()
     
     def pause_job(self, job_id: str):
         """Pause a specific job."""
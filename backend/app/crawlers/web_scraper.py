@@ -2,6 +2,7 @@
 Web Scraper with robots.txt compliance and intelligent content extraction.
 """
 import logging
+import threading
 import time
 import hashlib
 from datetime import datetime
@@ -27,12 +28,14 @@ class WebScraper:
     Intelligent web scraper with robots.txt compliance and content extraction.
     """
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, http_session: Optional[requests.Session] = None):
         """
         Initialize Web Scraper.
         
         Args:
             config: Configuration dictionary with scraper settings
+            http_session: Optional shared requests session (connection pooling);
+                when omitted a session with retries is created
         """
         self.config = config or {}
         self.user_agent = self.config.get(
@@ -48,17 +51,21 @@ class WebScraper:
         # Initialize proxy manager
         self.proxy_manager = ProxyManager(config)
         self._ai_pipeline = None  # Lazy initialization
+        self._ai_lock = threading.Lock()  # Crawls may run in worker threads
         
         # Setup session with retries
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=self.max_retries,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        if http_session is not None:
+            self.session = http_session
+        else:
+            self.session = requests.Session()
+            retry_strategy = Retry(
+                total=self.max_retries,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+            adapter = HTTPAdapter(max_retries=retry_strategy)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
         
         # Headers
         self.headers = {
@@ -84,25 +91,26 @@ class WebScraper:
         Returns:
             LangChainService instance or None if initialization fails
         """
-        if self._ai_pipeline is None:
-            try:
-                from app.ai.langchain_service import LangChainService
+        with self._ai_lock:
+            if self._ai_pipeline is None:
+                try:
+                    from app.ai.langchain_service import LangChainService
                 
-                # Use configuration from scraper config or defaults
-                ai_config = {
-                    'EMBEDDINGS_MODEL': self.config.get('EMBEDDINGS_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'),
-                    'VECTOR_STORE_PATH': self.config.get('VECTOR_STORE_PATH', 'data/vector_stores'),
-                    'LLM_MODEL': self.config.get('LLM_MODEL', 'qwen3:4b'),
-                    'OLLAMA_BASE_URL': self.config.get('OLLAMA_BASE_URL', 'http://localhost:11434'),
-                    'RERANKER_MODEL': self.config.get('RERANKER_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
-                }
+                    # Use configuration from scraper config or defaults
+                    ai_config = {
+                        'EMBEDDINGS_MODEL': self.config.get('EMBEDDINGS_MODEL', 'sentence-transformers/all-MiniLM-L6-v2'),
+                        'VECTOR_STORE_PATH': self.config.get('VECTOR_STORE_PATH', 'data/vector_stores'),
+                        'LLM_MODEL': self.config.get('LLM_MODEL', 'qwen3:4b'),
+                        'OLLAMA_BASE_URL': self.config.get('OLLAMA_BASE_URL', 'http://localhost:11434'),
+                        'RERANKER_MODEL': self.config.get('RERANKER_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+                    }
                 
-                self._ai_pipeline = LangChainService(config=ai_config)
-                logger.info("AI processing pipeline initialized for web scraper")
+                    self._ai_pipeline = LangChainService(config=ai_config)
+                    logger.info("AI processing pipeline initialized for web scraper")
                 
-            except Exception as e:
-                logger.error(f"Failed to initialize AI pipeline for web scraper: {e}")
-                self._ai_pipeline = None
+                except Exception as e:
+                    logger.error(f"Failed to initialize AI pipeline for web scraper: {e}")
+                    self._ai_pipeline = None
         
         return self._ai_pipeline
     
@@ -605,7 +613,9 @@ class WebScraper:
             try:
                 ai_pipeline = self._get_ai_pipeline()
                 if ai_pipeline:
-                    success = ai_pipeline.process_document(document)
+                    # The vector store is not thread-safe; serialize writes
+                    with self._ai_lock:
+                        success = ai_pipeline.process_document(document)
                     if success:
                         logger.info(f"Document processed through AI pipeline: {document.title}")
                     else:
@@ -6,5 +6,6 @@ from .document import Document
 from .source import Source
 from .tag import Tag
 from .search_history import SearchHistory
+from .crawler_metric import CrawlerMetric
 
-__all__ = ['User', 'Document', 'Source', 'Tag', 'SearchHistory']
+__all__ = ['User', 'Document', 'Source', 'Tag', 'SearchHistory', 'CrawlerMetric']
@@ -0,0 +1,107 @@
+"""
+Crawler metric model for tracking conditional-request cache efficiency.
+"""
+from datetime import datetime, date
+from sqlalchemy import func
+from app import db
+
+
+class CrawlerMetric(db.Model):
+    """
+    Daily per-source counters for conditional HTTP requests (ETag / If-Modified-Since).
+    
+    Only RSS feeds send conditional requests. The crawler keeps the validators
+    and body sizes it needs in memory, so counters are only recorded by
+    long-running processes (the scheduler); one-shot runs such as ``crawl-now``
+    start with empty caches and send no conditional requests.
+    """
+    
+    __tablename__ = 'crawler_metrics'
+    __table_args__ = (
+        db.UniqueConstraint('date', 'source_id', name='uq_crawler_metrics_date_source'),
+    )
+    
+    # Primary fields
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, db.ForeignKey('sources.id', ondelete='CASCADE'), nullable=False, index=True)
+    date = db.Column(db.Date, default=date.today, nullable=False, index=True)
+    
+    # Counters
+    conditional_hits = db.Column(db.Integer, default=0)  # 304 Not Modified responses
+    conditional_misses = db.Column(db.Integer, default=0)  # full responses
+    bytes_saved = db.Column(db.Integer, default=0)  # estimated body bytes not transferred
+    
+    # Timestamps
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CrawlerMetric source={self.source_id} date={self.date}>'
+    
+    def get_hit_rate(self):
+        """Calculate conditional-request hit rate."""
+        total = (self.conditional_hits or 0) + (self.conditional_misses or 0)
+        if total == 0:
+            return 0.0
+        return (self.conditional_hits / total) * 100
+    
+    def to_dict(self):
+        """Convert metric to dictionary."""
+        return {
+            'id': self.id,
+            'source_id': self.source_id,
+            'date': self.date.isoformat() if self.date else None,
+            'conditional_hits': self.conditional_hits,
+            'conditional_misses': self.conditional_misses,
+            'bytes_saved': self.bytes_saved,
+            'hit_rate': self.get_hit_rate(),
+        }
+    
+    @classmethod
+    def record(cls, source_id, conditional_hits=0, conditional_misses=0, bytes_saved=0):
+        """
+        Add counters to today's row for a source.
+        
+        The change is left in the session; it is committed together with the
+        crawl's own changes (e.g. Source.update_crawl_stats).
+        """
+        if not (conditional_hits or conditional_misses or bytes_saved):
+            return None
+        
+        today = date.today()
+        metric = cls.query.filter_by(source_id=source_id, date=today).first()
+        if not metric:
+            metric = cls(
+                source_id=source_id,
+                date=today,
+                conditional_hits=0,
+                conditional_misses=0,
+                bytes_saved=0
+            )
+            db.session.add(metric)
+        
+        metric.conditional_hits += conditional_hits
+        metric.conditional_misses += conditional_misses
+        metric.bytes_saved += bytes_saved
+        return metric
+    
+    @classmethod
+    def get_totals(cls, since=None):
+        """Get summed counters, optionally from a start date onwards."""
+        query = db.session.query(
+            func.coalesce(func.sum(cls.conditional_hits), 0),
+            func.coalesce(func.sum(cls.conditional_misses), 0),
+            func.coalesce(func.sum(cls.bytes_saved), 0),
+        )
+        
+        if since:
+            query = query.filter(cls.date >= since)
+        
+        hits, misses, bytes_saved = query.one()
+        total = hits + misses
+        
+        return {
+            'conditional_hits': hits,
+            'conditional_misses': misses,
+            'bytes_saved': bytes_saved,
+            'hit_rate': round(hits / total * 100, 2) if total else 0.0,
+        }
@@ -199,8 +199,8 @@ class Document(db.Model):
         return result
     
     @staticmethod
-    def create_document(user_id, title, content, **kwargs):
-        """Create a new document."""
+    def create_document(user_id, title, content, commit=True, **kwargs):
+        """Create a new document (flushed only when ``commit`` is False)."""
         # Extract tags before passing kwargs to constructor
         tags = kwargs.pop('tags', None)
         
@@ -222,7 +222,8 @@ class Document(db.Model):
         if tags:
             document.set_tags(tags)
         
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
         return document
     
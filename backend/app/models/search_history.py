@@ -38,7 +38,7 @@ class SearchHistory(db.Model):
     user_feedback = db.Column(db.String(20))  # 'helpful', 'not_helpful', 'partially_helpful'
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     def __repr__(self):
         return f'<SearchHistory {self.query[:50]}...>'
@@ -264,13 +264,26 @@ class SearchHistory(db.Model):
                        .all()
     
     @classmethod
-    def cleanup_old_searches(cls, days=90):
-        """Remove search history older than specified days."""
+    def cleanup_old_searches(cls, days=90, batch_size=1000):
+        """
+        Remove search history older than specified days.
+        
+        Rows are deleted in batches, each in its own short transaction, so the
+        write lock is released between batches and crawlers can interleave.
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
-        old_searches = db.session.query(cls).filter(cls.created_at < cutoff_date)
-        count = old_searches.count()
-        old_searches.delete()
+        count = 0
+        while True:
+            ids = [row[0] for row in db.session.query(cls.id)
+                                               .filter(cls.created_at < cutoff_date)
+                                               .limit(batch_size)
+                                               .all()]
+            if not ids:
+                break
+            
+            db.session.query(cls).filter(cls.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            count += len(ids)
         
-        db.session.commit()
         return count
@@ -1,6 +1,7 @@
 """
 Source model for RSS feeds and web crawling sources.
 """
+import math
 from datetime import datetime, timedelta
 from app import db
 
@@ -9,6 +10,9 @@ class Source(db.Model):
     """Source model for RSS feeds and web crawling configuration."""
     
     __tablename__ = 'sources'
+    __table_args__ = (
+        db.Index('ix_sources_type_active', 'source_type', 'is_active'),
+    )
     
     # Primary fields
     id = db.Column(db.Integer, primary_key=True)
@@ -51,6 +55,10 @@ class Source(db.Model):
     # Auto-tagging configuration
     auto_tags = db.Column(db.JSON, default=list)  # List of tags to automatically apply
     
+    # Relationships
+    metrics = db.relationship('CrawlerMetric', backref='source', lazy='dynamic',
+                              cascade='all, delete-orphan', passive_deletes=True)
+    
     def __repr__(self):
         return f'<Source {self.name}>'
     
@@ -86,6 +94,24 @@ class Source(db.Model):
         
         return datetime.utcnow() >= self.next_crawl
     
+    def crawl_priority(self, now=None):
+        """
+        Score how valuable crawling this source right now is.
+        
+        Staleness (time since the last crawl relative to the update frequency)
+        weighted by the historical article yield. Higher scores crawl first.
+        """
+        now = now or datetime.utcnow()
+        reference = self.last_crawled or self.created_at or now
+        interval = (self.update_frequency or 30) * 60
+        staleness = max((now - reference).total_seconds(), 0) / interval
+        
+        if not self.last_crawled:
+            # Never crawled: at least one full interval overdue
+            staleness = max(staleness, 1.0)
+        
+        return staleness * (1 + math.log1p(self.total_articles or 0))
+    
     def get_success_rate(self):
         """Calculate crawling success rate."""
         total = self.successful_crawls + self.failed_crawls
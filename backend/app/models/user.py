@@ -2,6 +2,7 @@
 User model for authentication and user management.
 """
 from datetime import datetime
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import create_access_token, create_refresh_token
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -49,7 +50,12 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set user password."""
-        self.password_hash = generate_password_hash(password)
+        # PASSWORD_HASH_METHOD lets the testing config use a cheap hash
+        method = current_app.config.get('PASSWORD_HASH_METHOD') if has_app_context() else None
+        if method:
+            self.password_hash = generate_password_hash(password, method=method)
+        else:
+            self.password_hash = generate_password_hash(password)
     
     def check_password(self, password):
         """Check if provided password matches user's password."""
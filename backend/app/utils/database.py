@@ -0,0 +1,68 @@
+"""
+Database maintenance helpers.
+"""
+import logging
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+def is_sqlite():
+    """Check whether the bound engine is SQLite."""
+    return db.engine.dialect.name == 'sqlite'
+
+
+def optimize_database(full=False):
+    """
+    Optimize the database (SQLite only).
+    
+    By default runs ``PRAGMA optimize`` and ``PRAGMA incremental_vacuum``, which
+    are cheap and do not rewrite the database file. ``full=True`` switches the
+    database to incremental auto-vacuum and runs a full ``VACUUM``, which
+    rewrites every page and holds an exclusive lock for the duration.
+    
+    Databases created before incremental auto-vacuum was enabled are still in
+    ``auto_vacuum = NONE`` mode, where ``incremental_vacuum`` is a no-op; run
+    once with ``full=True`` to convert them.
+    
+    Args:
+        full: Run a full VACUUM instead of the incremental variant
+    
+    Returns:
+        True if the database was optimized, False if not applicable
+    """
+    if not is_sqlite():
+        return False
+    
+    with db.engine.connect() as conn:
+        if full:
+            # auto_vacuum only changes on an existing database after a VACUUM
+            conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.exec_driver_sql('VACUUM')
+        else:
+            # 0 = NONE, 1 = FULL, 2 = INCREMENTAL
+            if conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() != 2:
+                logger.warning("auto_vacuum is not INCREMENTAL; run a full "
+                               "optimization once to enable it")
+            # pysqlite only steps the pragma once (freeing a single page);
+            # executescript runs it to completion
+            conn.connection.dbapi_connection.executescript('PRAGMA incremental_vacuum;')
+        conn.exec_driver_sql('PRAGMA optimize')
+    
+    logger.info(f"Database optimized ({'full VACUUM' if full else 'incremental'})")
+    return True
+
+
+def create_tables():
+    """
+    Create all tables, enabling incremental auto-vacuum on new SQLite databases.
+    """
+    if not is_sqlite():
+        db.create_all()
+        return
+    
+    with db.engine.begin() as conn:
+        # Only takes effect before the first table is created
+        conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+        db.metadata.create_all(bind=conn)
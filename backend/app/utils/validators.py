@@ -3,11 +3,34 @@ Validation utilities for input validation and security.
 """
 import re
 import os
+from functools import lru_cache
 from typing import Tuple
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 import html
 
+# Compiled once at import; the validators run on every auth/content request
+_LOWERCASE_RE = re.compile(r"[a-z]")
+_UPPERCASE_RE = re.compile(r"[A-Z]")
+_DIGIT_RE = re.compile(r"\d")
+_SPECIAL_CHAR_RE = re.compile(r"[!@#$%^&*()_+\-=\[\]{};':\"\\|,.<>\/?]")
+# Email parts are matched separately so no pattern has to backtrack over dots
+_EMAIL_LOCAL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+\Z')
+_EMAIL_DOMAIN_RE = re.compile(r'^[a-zA-Z0-9.-]+\Z')
+_EMAIL_TLD_RE = re.compile(r'^[a-zA-Z]{2,}$')
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+_TAG_RE = re.compile(r'^[a-zA-Z0-9_\-\s]+$')
+
+# Forbidden search-query substrings, each group scanned in a single regex pass
+_SQL_INJECTION_RE = re.compile('|'.join(map(re.escape, [
+    'union select', 'drop table', 'delete from', 'insert into',
+    'update set', 'exec ', 'execute ', 'xp_', 'sp_',
+    '@@', 'waitfor delay'
+])))
+_SCRIPT_INJECTION_RE = re.compile('|'.join(map(re.escape, [
+    '<script', 'javascript:', 'vbscript:', 'onload=', 'onerror='
+])))
+
 
 def validate_password_strength(password: str) -> Tuple[bool, str]:
     """
@@ -25,16 +48,16 @@ def validate_password_strength(password: str) -> Tuple[bool, str]:
     if len(password) > 128:
         return False, "Password must be no more than 128 characters long"
     
-    if not re.search(r"[a-z]", password):
+    if not _LOWERCASE_RE.search(password):
         return False, "Password must contain at least one lowercase letter"
     
-    if not re.search(r"[A-Z]", password):
+    if not _UPPERCASE_RE.search(password):
         return False, "Password must contain at least one uppercase letter"
     
-    if not re.search(r"\d", password):
+    if not _DIGIT_RE.search(password):
         return False, "Password must contain at least one digit"
     
-    if not re.search(r"[!@#$%^&*()_+\-=\[\]{};':\"\\|,.<>\/?]", password):
+    if not _SPECIAL_CHAR_RE.search(password):
         return False, "Password must contain at least one special character"
     
     # Check for extremely common patterns (be less strict for testing)
@@ -62,9 +85,23 @@ def validate_email(email: str) -> bool:
     """
     if not email or not isinstance(email, str):
         return False
-        
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    
+    # RFC 5321 caps a mailbox at 254 characters; reject before any scanning
+    if len(email) > 254:
+        return False
+    
+    # local@name.tld with exactly one '@'; the TLD follows the last dot
+    local, _, domain = email.partition('@')
+    if not domain or '@' in domain:
+        return False
+    
+    name, _, tld = domain.rpartition('.')
+    return bool(
+        name
+        and _EMAIL_LOCAL_RE.match(local)
+        and _EMAIL_DOMAIN_RE.match(name)
+        and _EMAIL_TLD_RE.match(tld)
+    )
 
 
 def validate_username(username: str) -> Tuple[bool, str]:
@@ -86,7 +123,7 @@ def validate_username(username: str) -> Tuple[bool, str]:
     if len(username) > 50:
         return False, "Username must be no more than 50 characters long"
     
-    if not re.match(r'^[a-zA-Z0-9_-]+$', username):
+    if not _USERNAME_RE.match(username):
         return False, "Username can only contain letters, numbers, hyphens and underscores"
     
     # Reserved usernames
@@ -112,6 +149,20 @@ def validate_url(url: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, message)
     """
+    # Only strings reach the cache (unhashable input would raise in it)
+    if not isinstance(url, str):
+        return False, "Invalid URL format"
+    
+    return _validate_url(url)
+
+
+@lru_cache(maxsize=4096)
+def _validate_url(url: str) -> Tuple[bool, str]:
+    """Memoized body of validate_url; the crawlers re-check the same source URLs."""
+    # Reject oversized input before parsing it
+    if url and len(url) > 2048:
+        return False, "URL too long (max 2048 characters)"
+    
     try:
         parsed = urlparse(url)
         
@@ -152,26 +203,19 @@ def sanitize_html_content(content: str) -> str:
     if not content:
         return ""
     
+    # Plain text: nothing to parse, just decode entities like the parser would
+    if '<' not in content:
+        return html.escape(html.unescape(content).strip())
+    
     # Parse HTML
     soup = BeautifulSoup(content, 'html.parser')
     
-    # Remove dangerous tags completely
+    # Remove dangerous tags completely (their text would otherwise survive get_text);
+    # attributes never reach the output, so they need no separate scrub
     dangerous_tags = ['script', 'style', 'meta', 'link', 'object', 'embed', 'iframe', 'frame']
     for tag in soup.find_all(dangerous_tags):
         tag.decompose()
     
-    # Remove dangerous attributes
-    dangerous_attrs = [
-        'onload', 'onclick', 'onmouseover', 'onfocus', 'onerror',
-        'onsubmit', 'onchange', 'onselect', 'onkeydown', 'onkeyup',
-        'javascript:', 'vbscript:', 'data:'
-    ]
-    
-    for tag in soup.find_all():
-        for attr in list(tag.attrs.keys()):
-            if attr.lower() in dangerous_attrs or any(danger in str(tag.attrs[attr]).lower() for danger in dangerous_attrs):
-                del tag.attrs[attr]
-    
     # Get clean text
     clean_text = soup.get_text(separator=' ', strip=True)
     
@@ -194,22 +238,33 @@ def validate_file_upload(file, allowed_extensions=None, max_size=None):
     if not file or not file.filename:
         return False, "No file provided"
     
-    # Check file size
-    if max_size:
-        file.seek(0, os.SEEK_END)
-        size = file.tell()
-        file.seek(0)  # Reset pointer
-        
-        if size > max_size:
-            return False, f"File too large. Maximum size: {max_size // (1024*1024)}MB"
-    
-    # Check file extension
+    # Check file extension (cheapest check first)
     if allowed_extensions:
         file_ext = file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else ''
         
         if file_ext not in allowed_extensions:
             return False, f"File type '{file_ext}' not allowed. Allowed types: {', '.join(allowed_extensions)}"
     
+    # Check file size without reading the payload. The part's declared
+    # Content-Length is client-controlled, so it only rejects early; the
+    # stream's end offset is still measured whenever it can be
+    if max_size:
+        declared = getattr(file, 'content_length', 0) or 0
+        if declared > max_size:
+            return False, f"File too large. Maximum size: {max_size // (1024*1024)}MB"
+        
+        try:
+            file.seek(0, os.SEEK_END)
+            size = max(declared, file.tell())
+            file.seek(0)  # Reset pointer
+        except (AttributeError, OSError):
+            if not declared:
+                return False, "Could not determine file size"
+            size = declared
+        
+        if size > max_size:
+            return False, f"File too large. Maximum size: {max_size // (1024*1024)}MB"
+    
     # Check for suspicious filenames
     suspicious_patterns = [
         '..', '/', '\\', ':', '*', '?', '"', '<', '>', '|',
@@ -240,23 +295,17 @@ def validate_search_query(query: str) -> Tuple[bool, str]:
     if len(query) > 1000:
         return False, "Search query too long (max 1000 characters)"
     
-    # Check for SQL injection patterns
-    sql_patterns = [
-        'union select', 'drop table', 'delete from', 'insert into',
-        'update set', 'exec ', 'execute ', 'xp_', 'sp_',
-        '@@', 'waitfor delay'
-    ]
-    
     query_lower = query.lower()
-    for pattern in sql_patterns:
-        if pattern in query_lower:
-            return False, f"Search query contains potentially dangerous pattern: {pattern}"
+    
+    # Check for SQL injection patterns
+    match = _SQL_INJECTION_RE.search(query_lower)
+    if match:
+        return False, f"Search query contains potentially dangerous pattern: {match.group()}"
     
     # Check for script injection
-    script_patterns = ['<script', 'javascript:', 'vbscript:', 'onload=', 'onerror=']
-    for pattern in script_patterns:
-        if pattern in query_lower:
-            return False, f"Search query contains script pattern: {pattern}"
+    match = _SCRIPT_INJECTION_RE.search(query_lower)
+    if match:
+        return False, f"Search query contains script pattern: {match.group()}"
     
     return True, "Query is valid"
 
@@ -283,7 +332,7 @@ def validate_tag_name(tag: str) -> Tuple[bool, str]:
         return False, "Tag name must be no more than 50 characters long"
     
     # Allow letters, numbers, hyphens, underscores, and spaces
-    if not re.match(r'^[a-zA-Z0-9_\-\s]+$', tag):
+    if not _TAG_RE.match(tag):
         return False, "Tag name can only contain letters, numbers, hyphens, underscores, and spaces"
     
     # No consecutive spaces
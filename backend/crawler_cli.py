@@ -4,29 +4,150 @@ Command-line interface for managing the XU-News-AI-RAG crawler system.
 """
 import os
 import sys
+import signal
 import click
+import json
 import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from urllib.parse import urlparse
 from flask import current_app
+from sqlalchemy import func, case
 
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app, db
-from app.models import Source, Document, User
-from app.crawlers.scheduler import CrawlerScheduler
-from app.crawlers.rss_crawler import RSSCrawler
-from app.crawlers.web_scraper import WebScraper
+from app.models import Source, Document, User, CrawlerMetric
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON serialization
+    orjson = None
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-# Global scheduler instance
+# Global scheduler instance (created on first use)
 scheduler = None
 
 
+def _get_scheduler(app):
+    """
+    Return the shared scheduler, creating it on first use.
+    
+    Crawler modules (feedparser, bs4, apscheduler, ...) are imported here
+    rather than at module level so --help and read-only commands stay fast.
+    """
+    global scheduler
+    if scheduler is None:
+        from app.crawlers.scheduler import CrawlerScheduler
+        scheduler = CrawlerScheduler(app.config, app=app)
+    return scheduler
+
+
+def _emit_json(data):
+    """Write data to stdout as a single JSON document."""
+    if orjson is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(data, default=str) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        sys.stdout.write(json.dumps(data, default=str) + "\n")
+
+
+OUTPUT_OPTION = click.option('--output', type=click.Choice(['text', 'json']), default='text',
+                             show_default=True, help='Output format')
+
+
+def _source_host(source):
+    """Return the network location used to group sources for politeness."""
+    return urlparse(source.url).netloc.lower()
+
+
+def _interleave_by_host(sources):
+    """
+    Order sources round-robin across hosts so concurrent workers spread
+    over distinct hosts instead of queueing on the same one.
+    """
+    by_host = defaultdict(list)
+    for source in sources:
+        by_host[_source_host(source)].append(source)
+    
+    ordered = []
+    queues = list(by_host.values())
+    while queues:
+        ordered.extend(queue.pop(0) for queue in queues)
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+def _probe_hosts(sources, timeout):
+    """
+    Send one HEAD request per host in parallel and return the hosts that answered.
+    
+    Any HTTP response counts as reachable; only connection errors and
+    timeouts (DNS failure, refused, unroutable) mark a host as dead.
+    """
+    # Imported here (like the crawler stack) so --help and status stay fast
+    import requests
+    
+    host_urls = {}
+    for source in sources:
+        host_urls.setdefault(_source_host(source), source.url)
+    
+    def probe(url):
+        try:
+            requests.head(url, timeout=timeout, allow_redirects=False)
+            return True
+        except requests.RequestException:
+            return False
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(32, len(host_urls)))) as executor:
+        reachable = dict(zip(host_urls, executor.map(probe, host_urls.values())))
+    
+    return {host for host, ok in reachable.items() if ok}
+
+
+def _build_http_session(pool_size):
+    """Create a requests session with a keep-alive pool sized for the crawl workers."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    # No adapter-level retries: the crawlers run their own retry loops
+    adapter = HTTPAdapter(
+        pool_connections=max(pool_size, 10),
+        pool_maxsize=pool_size
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _crawl_one(app, source_id, rss_crawler, web_scraper, host_lock):
+    """
+    Crawl a single source inside its own application context (worker thread).
+    
+    Only one fetch per host is in flight at a time (``host_lock``).
+    
+    Returns:
+        Tuple of (success, articles_count, error_message)
+    """
+    with host_lock, app.app_context():
+        source = db.session.get(Source, source_id)
+        if not source:
+            return False, 0, f"Source {source_id} not found"
+        
+        if source.source_type == 'rss':
+            return rss_crawler.crawl_source(source, bulk=True)
+        return web_scraper.scrape_source(source)
+
+
 @click.group()
 @click.option('--config', default='development', help='Configuration name (development, production, testing)')
 @click.pass_context
@@ -36,11 +157,6 @@ def cli(ctx, config):
     app = create_app(config)
     ctx.ensure_object(dict)
     ctx.obj['app'] = app
-    
-    with app.app_context():
-        # Initialize scheduler
-        global scheduler
-        scheduler = CrawlerScheduler(app.config)
 
 
 @cli.command()
@@ -51,6 +167,7 @@ def start_scheduler(ctx):
     
     with app.app_context():
         try:
+            scheduler = _get_scheduler(app)
             if scheduler.is_running():
                 click.echo("Scheduler is already running!")
                 return
@@ -59,20 +176,18 @@ def start_scheduler(ctx):
             scheduler.start()
             click.echo("✅ Crawler scheduler started successfully!")
             
-            # Keep the process running
-            try:
-                while True:
-                    import time
-                    time.sleep(60)  # Check every minute
-                    
-                    if not scheduler.is_running():
-                        click.echo("❌ Scheduler stopped unexpectedly!")
-                        break
-                    
-            except KeyboardInterrupt:
+            # Block until the scheduler shuts down or a signal asks us to stop
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: scheduler.request_stop())
+            
+            scheduler.wait_until_stopped()
+            
+            if scheduler.is_running():
                 click.echo("\n🛑 Stopping crawler scheduler...")
                 scheduler.stop()
                 click.echo("✅ Crawler scheduler stopped.")
+            else:
+                click.echo("❌ Scheduler stopped unexpectedly!")
                 
         except Exception as e:
             click.echo(f"❌ Failed to start scheduler: {e}")
@@ -87,6 +202,7 @@ def stop_scheduler(ctx):
     
     with app.app_context():
         try:
+            scheduler = _get_scheduler(app)
             if not scheduler.is_running():
                 click.echo("Scheduler is not running.")
                 return
@@ -101,16 +217,22 @@ def stop_scheduler(ctx):
 
 
 @cli.command()
+@OUTPUT_OPTION
 @click.pass_context
-def status(ctx):
+def status(ctx, output):
     """Show crawler scheduler status."""
     app = ctx.obj['app']
     
     with app.app_context():
         try:
+            scheduler = _get_scheduler(app)
             stats = scheduler.get_scheduler_stats()
             jobs = scheduler.get_job_status()
             
+            if output == 'json':
+                _emit_json({'scheduler': stats, 'jobs': jobs})
+                return
+            
             click.echo("📊 Crawler Scheduler Status")
             click.echo("=" * 50)
             click.echo(f"Running: {'✅ Yes' if stats['is_running'] else '❌ No'}")
@@ -127,12 +249,7 @@ def status(ctx):
                 click.echo("-" * 50)
                 for job in jobs:
                     next_run = job['next_run_time']
-                    if next_run:
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(next_run.replace('Z', '+00:00'))
-                        next_run_str = dt.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        next_run_str = 'Not scheduled'
+                    next_run_str = next_run.strftime('%Y-%m-%d %H:%M:%S') if next_run else 'Not scheduled'
                     
                     click.echo(f"• {job['name']}")
                     click.echo(f"  ID: {job['id']}")
@@ -149,8 +266,11 @@ def status(ctx):
 
 @cli.command()
 @click.option('--user-id', type=int, help='Crawl sources for specific user only')
+@click.option('--probe-timeout', type=float, default=3, show_default=True,
+              help='Seconds to wait for the pre-flight reachability probe (0 disables it)')
+@click.option('--dry-run', is_flag=True, help='Only probe and list the sources that would be crawled')
 @click.pass_context
-def crawl_now(ctx, user_id):
+def crawl_now(ctx, user_id, probe_timeout, dry_run):
     """Trigger immediate crawling for all due sources."""
     app = ctx.obj['app']
     
@@ -170,36 +290,86 @@ def crawl_now(ctx, user_id):
                 click.echo("No sources are due for crawling.")
                 return
             
-            # Initialize crawlers
-            rss_crawler = RSSCrawler(app.config)
-            web_scraper = WebScraper(app.config)
+            # Most overdue / productive sources first
+            now = datetime.utcnow()
+            due_sources.sort(key=lambda source: source.crawl_priority(now), reverse=True)
             
             total_articles = 0
             successful_sources = 0
             failed_sources = 0
+            results = []
             
-            with click.progressbar(due_sources, label='Crawling sources') as bar:
-                for source in bar:
-                    try:
-                        if source.source_type == 'rss':
-                            success, articles_count, error = rss_crawler.crawl_source(source)
-                        elif source.source_type == 'web':
-                            success, articles_count, error = web_scraper.scrape_source(source)
-                        else:
-                            click.echo(f"⚠️  Skipping unsupported source type: {source.source_type}")
-                            continue
-                        
-                        if success:
-                            successful_sources += 1
-                            total_articles += articles_count
-                            click.echo(f"✅ {source.name}: {articles_count} articles")
-                        else:
-                            failed_sources += 1
-                            click.echo(f"❌ {source.name}: {error}")
+            crawlable = []
+            for source in due_sources:
+                if source.source_type in ('rss', 'web'):
+                    crawlable.append(source)
+                else:
+                    click.echo(f"⚠️  Skipping unsupported source type: {source.source_type}")
+            
+            # Pre-flight: skip sources whose host is down instead of waiting on connect timeouts
+            if probe_timeout > 0 and crawlable:
+                live_hosts = _probe_hosts(crawlable, probe_timeout)
+                unreachable = [source for source in crawlable if _source_host(source) not in live_hosts]
+                crawlable = [source for source in crawlable if _source_host(source) in live_hosts]
+                
+                if unreachable:
+                    click.echo(f"⚠️  Skipping {len(unreachable)} unreachable sources:")
+                    for source in unreachable:
+                        click.echo(f"  - {source.name} ({source.url})")
+            
+            if dry_run:
+                click.echo(f"\n🔍 Dry run: {len(crawlable)} sources would be crawled:")
+                for source in crawlable:
+                    click.echo(f"  - [{source.id}] {source.name} ({source.source_type})")
+                return
+            
+            # Politeness: at most one in-flight fetch per host, parallel across hosts
+            crawlable = _interleave_by_host(crawlable)
+            host_locks = {_source_host(source): threading.Semaphore(1) for source in crawlable}
+            max_workers = max(1, min(app.config.get('CRAWLER_MAX_CONCURRENT_REQUESTS', 5), len(host_locks)))
+            
+            # Initialize crawlers (shared by all worker threads) on one keep-alive
+            # connection pool, so repeat visits to a host skip the TCP/TLS handshake
+            from app.crawlers.rss_crawler import RSSCrawler
+            from app.crawlers.web_scraper import WebScraper
+            http_session = _build_http_session(max_workers)
+            rss_crawler = RSSCrawler(app.config, http_session=http_session)
+            web_scraper = WebScraper(app.config, http_session=http_session)
+            
+            try:
+                with click.progressbar(length=len(crawlable), label='Crawling sources') as bar, \
+                        ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(
+                            _crawl_one, app, source.id, rss_crawler, web_scraper,
+                            host_locks[_source_host(source)]
+                        ): source.name
+                        for source in crawlable
+                    }
+                    
+                    # Collect per-source lines; echoing inside the bar forces a redraw per source
+                    for future in as_completed(futures):
+                        source_name = futures[future]
+                        bar.update(1)
+                        try:
+                            success, articles_count, error = future.result()
                             
-                    except Exception as e:
-                        failed_sources += 1
-                        click.echo(f"❌ {source.name}: {str(e)}")
+                            if success:
+                                successful_sources += 1
+                                total_articles += articles_count
+                                results.append(f"✅ {source_name}: {articles_count} articles")
+                            else:
+                                failed_sources += 1
+                                results.append(f"❌ {source_name}: {error}")
+                                
+                        except Exception as e:
+                            failed_sources += 1
+                            results.append(f"❌ {source_name}: {str(e)}")
+            finally:
+                http_session.close()
+            
+            if results:
+                click.echo('\n'.join(results))
             
             click.echo(f"\n📊 Crawling Summary:")
             click.echo(f"Total articles collected: {total_articles}")
@@ -228,9 +398,11 @@ def crawl_source(ctx, source_id):
             click.echo(f"🚀 Crawling source: {source.name}")
             
             if source.source_type == 'rss':
+                from app.crawlers.rss_crawler import RSSCrawler
                 crawler = RSSCrawler(app.config)
                 success, articles_count, error = crawler.crawl_source(source)
             elif source.source_type == 'web':
+                from app.crawlers.web_scraper import WebScraper
                 scraper = WebScraper(app.config)
                 success, articles_count, error = scraper.scrape_source(source)
             else:
@@ -249,23 +421,30 @@ def crawl_source(ctx, source_id):
 
 
 @cli.command()
+@OUTPUT_OPTION
 @click.pass_context
-def list_sources(ctx):
+def list_sources(ctx, output):
     """List all crawling sources."""
     app = ctx.obj['app']
     
     with app.app_context():
         try:
-            sources = Source.query.all()
+            if output == 'json':
+                sources = Source.query.order_by(Source.id).enable_eagerloads(False).yield_per(200)
+                _emit_json([dict(source.to_dict(), user_id=source.user_id) for source in sources])
+                return
+            
+            total = db.session.query(func.count(Source.id)).scalar()
             
-            if not sources:
+            if not total:
                 click.echo("No sources configured.")
                 return
             
-            click.echo(f"📋 Crawling Sources ({len(sources)}):")
+            click.echo(f"📋 Crawling Sources ({total}):")
             click.echo("=" * 80)
             
-            for source in sources:
+            # Stream rows in batches instead of materializing every source
+            for source in Source.query.order_by(Source.id).enable_eagerloads(False).yield_per(200):
                 status_icon = "✅" if source.is_active else "❌"
                 last_crawled = source.last_crawled.strftime('%Y-%m-%d %H:%M') if source.last_crawled else 'Never'
                 
@@ -284,27 +463,65 @@ def list_sources(ctx):
 
 
 @cli.command()
+@OUTPUT_OPTION
 @click.pass_context
-def stats(ctx):
+def stats(ctx, output):
     """Show crawler statistics."""
     app = ctx.obj['app']
     
     with app.app_context():
         try:
-            # Overall statistics
-            total_sources = Source.query.count()
-            active_sources = Source.query.filter_by(is_active=True).count()
-            total_documents = Document.query.count()
-            total_users = User.query.count()
-            
-            # Recent activity (last 24 hours)
+            # Recent activity window (last 24 hours)
             from datetime import datetime, timedelta
             yesterday = datetime.now() - timedelta(days=1)
-            recent_documents = Document.query.filter(Document.created_at >= yesterday).count()
             
-            # Statistics by source type
-            rss_sources = Source.query.filter_by(source_type='rss').count()
-            web_sources = Source.query.filter_by(source_type='web').count()
+            # One read transaction (consistent snapshot) for all statistics queries
+            with db.session.begin():
+                # Source statistics in a single scan
+                total_sources, active_sources, rss_sources, web_sources = db.session.query(
+                    func.count(Source.id),
+                    func.coalesce(func.sum(case((Source.is_active.is_(True), 1), else_=0)), 0),
+                    func.coalesce(func.sum(case((Source.source_type == 'rss', 1), else_=0)), 0),
+                    func.coalesce(func.sum(case((Source.source_type == 'web', 1), else_=0)), 0),
+                ).one()
+                
+                # Document statistics in a single scan
+                total_documents, recent_documents = db.session.query(
+                    func.count(Document.id),
+                    func.coalesce(func.sum(case((Document.created_at >= yesterday, 1), else_=0)), 0),
+                ).one()
+                
+                total_users = User.query.count()
+                
+                # Top sources by article count
+                top_sources = db.session.query(Source.name, Source.total_articles)\
+                                        .order_by(Source.total_articles.desc())\
+                                        .limit(5)\
+                                        .all()
+                
+                # Conditional-request (ETag / Last-Modified) efficiency, last 7 days
+                cache_stats = CrawlerMetric.get_totals(since=(datetime.now() - timedelta(days=7)).date())
+            
+            if output == 'json':
+                _emit_json({
+                    'users': total_users,
+                    'sources': {
+                        'total': total_sources,
+                        'active': active_sources,
+                        'rss': rss_sources,
+                        'web': web_sources,
+                    },
+                    'documents': {
+                        'total': total_documents,
+                        'added_24h': recent_documents,
+                    },
+                    'crawl_cache_7d': cache_stats,
+                    'top_sources': [
+                        {'name': name, 'total_articles': total_articles}
+                        for name, total_articles in top_sources
+                    ],
+                })
+                return
             
             click.echo("📊 XU-News-AI-RAG Statistics")
             click.echo("=" * 50)
@@ -316,13 +533,18 @@ def stats(ctx):
             click.echo(f"Total Documents: {total_documents}")
             click.echo(f"Documents Added (24h): {recent_documents}")
             
-            # Top sources by article count
-            top_sources = Source.query.order_by(Source.total_articles.desc()).limit(5).all()
+            click.echo(f"\n🗄️  Crawl Cache (7d):")
+            click.echo("-" * 30)
+            click.echo(f"Not Modified (hits): {cache_stats['conditional_hits']}")
+            click.echo(f"Full Fetches (misses): {cache_stats['conditional_misses']}")
+            click.echo(f"Hit Rate: {cache_stats['hit_rate']}%")
+            click.echo(f"Bytes Saved: {cache_stats['bytes_saved']}")
+            
             if top_sources:
                 click.echo(f"\n🏆 Top Sources by Articles:")
                 click.echo("-" * 30)
-                for i, source in enumerate(top_sources, 1):
-                    click.echo(f"{i}. {source.name}: {source.total_articles} articles")
+                for i, (name, total_articles) in enumerate(top_sources, 1):
+                    click.echo(f"{i}. {name}: {total_articles} articles")
             
         except Exception as e:
             click.echo(f"❌ Failed to get statistics: {e}")
@@ -331,8 +553,9 @@ def stats(ctx):
 
 @cli.command()
 @click.option('--days', default=30, help='Clean up data older than N days')
+@click.option('--full', is_flag=True, help='Run a full VACUUM (rewrites the whole database, SQLite only)')
 @click.pass_context
-def cleanup(ctx, days):
+def cleanup(ctx, days, full):
     """Clean up old data and optimize database."""
     app = ctx.obj['app']
     
@@ -355,8 +578,8 @@ def cleanup(ctx, days):
             click.echo(f"✅ Removed {removed_tags} unused tags")
             
             # Optimize database (SQLite specific)
-            if 'sqlite' in app.config.get('DATABASE_URL', ''):
-                db.engine.execute('VACUUM')
+            from app.utils.database import optimize_database
+            if optimize_database(full=full):
                 click.echo("✅ Database optimized")
             
             click.echo("✅ Cleanup completed successfully!")
@@ -12,43 +12,57 @@ Usage:
 """
 import os
 import sys
+import logging
 import argparse
 
 # Add current directory to path
 sys.path.insert(0, os.getcwd())
 
 from app import create_app, db
-from app.models import User, Document, Source, Tag, SearchHistory
+
+logger = logging.getLogger('init_database')
+
+def setup_logging():
+    """Send script output to stdout."""
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    logger.addHandler(stream_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
 def init_database(app):
     """Initialize database tables."""
-    print("=" * 60)
-    print("🔧 INITIALIZING DATABASE")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info("🔧 INITIALIZING DATABASE")
+    logger.info("=" * 60)
     
     try:
-        print("Creating database tables...")
-        db.create_all()
-        print("✓ Database tables created successfully!")
+        logger.info("Creating database tables...")
+        from app.utils.database import create_tables
+        create_tables()
+        logger.info("✓ Database tables created successfully!")
         return True
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
+        logger.error(f"❌ Error creating database tables: {e}")
         return False
 
-def create_demo_data(app):
+def create_demo_data(app, embed_now=False):
     """Create demo user and sample data."""
-    print("\n" + "=" * 60)
-    print("📝 CREATING DEMO DATA")
-    print("=" * 60)
+    from app.models import User, Document, Source
+    
+    logger.info("\n" + "=" * 60)
+    logger.info("📝 CREATING DEMO DATA")
+    logger.info("=" * 60)
     
     try:
         # Check if demo user already exists
         if User.query.filter_by(username='demo').first():
-            print("⚠️  Demo user already exists! Skipping demo data creation.")
-            print("   If you want to recreate demo data, please delete the existing 'demo' user first.")
+            logger.info("⚠️  Demo user already exists! Skipping demo data creation.")
+            logger.info("   If you want to recreate demo data, please delete the existing 'demo' user first.")
             return True
             
-        print("Creating demo user...")
+        logger.info("Creating demo user...")
         demo_user = User.create_user(
             username='demo',
             email='demo@xu-news-ai-rag.com',
@@ -57,9 +71,9 @@ def create_demo_data(app):
             last_name='User',
             is_verified=True
         )
-        print("✓ Demo user created successfully!")
+        logger.info("✓ Demo user created successfully!")
         
-        print("Creating sample RSS source...")
+        logger.info("Creating sample RSS source...")
         sample_source = Source.create_source(
             user_id=demo_user.id,
             name='TechCrunch',
@@ -68,12 +82,11 @@ def create_demo_data(app):
             description='Technology news and startup information',
             auto_tags=['tech', 'startup', 'news']
         )
-        print("✓ Sample RSS source created successfully!")
+        logger.info("✓ Sample RSS source created successfully!")
         
-        print("Creating sample documents...")
-        # Create sample documents
-        sample_doc1 = Document.create_document(
-            user_id=demo_user.id,
+        logger.info("Creating sample documents...")
+        # Sample document definitions
+        welcome_fields = dict(
             title='Welcome to XU-News-AI-RAG - Your AI-Powered Knowledge Base',
             content='''
             Welcome to XU-News-AI-RAG, an advanced AI-powered knowledge management system designed to revolutionize how you organize, search, and interact with information.
@@ -111,8 +124,7 @@ def create_demo_data(app):
             tags=['welcome', 'demo', 'introduction', 'features', 'ai', 'knowledge-base']
         )
         
-        sample_doc2 = Document.create_document(
-            user_id=demo_user.id,
+        guide_fields = dict(
             title='Getting Started Guide - Quick Start Instructions',
             content='''
             🚀 **Quick Start Guide for XU-News-AI-RAG**
@@ -157,8 +169,7 @@ def create_demo_data(app):
             tags=['guide', 'tutorial', 'getting-started', 'instructions', 'help']
         )
         
-        sample_doc3 = Document.create_document(
-            user_id=demo_user.id,
+        architecture_fields = dict(
             title='System Architecture & Technical Overview',
             content='''
             📋 **XU-News-AI-RAG Technical Architecture**
@@ -213,45 +224,58 @@ def create_demo_data(app):
             source_type='manual',
             tags=['architecture', 'technical', 'backend', 'frontend', 'ai', 'stack', 'documentation']
         )
-        print("✓ Sample documents created successfully!")
         
-        # Process sample documents through AI pipeline for semantic search
-        print("Processing documents through AI pipeline...")
-        try:
-            from app.ai.langchain_service import LangChainService
-            
-            ai_config = {
-                'EMBEDDINGS_MODEL': 'sentence-transformers/all-MiniLM-L6-v2',
-                'VECTOR_STORE_PATH': 'data/vector_stores',
-                'LLM_MODEL': 'qwen3:4b',
-                'OLLAMA_BASE_URL': 'http://localhost:11434',
-                'RERANKER_MODEL': 'cross-encoder/ms-marco-MiniLM-L-6-v2'
-            }
-            
-            ai_pipeline = LangChainService(config=ai_config)
-            
-            # Process each document through AI pipeline
-            for doc, doc_name in [(sample_doc1, "Welcome Document"), 
-                                 (sample_doc2, "Getting Started Guide"), 
-                                 (sample_doc3, "Technical Overview")]:
-                try:
-                    success = ai_pipeline.process_document(doc)
-                    if success:
-                        print(f"  ✓ {doc_name} processed through AI pipeline")
+        # Flush every document (and its tags) into one transaction, committed once
+        sample_docs = []
+        for doc_name, fields in [("Welcome Document", welcome_fields),
+                                 ("Getting Started Guide", guide_fields),
+                                 ("Technical Overview", architecture_fields)]:
+            document = Document.create_document(user_id=demo_user.id, commit=False, **fields)
+            sample_docs.append((document, doc_name))
+        db.session.commit()
+        logger.info("✓ Sample documents created successfully!")
+        
+        # Embedding loads several models; by default leave the documents pending
+        # for the crawler service's "Process Pending Documents" job
+        if not embed_now:
+            logger.info("✓ Sample documents queued for AI processing (indexed by the crawler service)")
+            logger.info("   Run with --embed-now to process them immediately")
+        else:
+            # Process sample documents through AI pipeline for semantic search
+            logger.info("Processing documents through AI pipeline...")
+            try:
+                from app.ai.langchain_service import LangChainService
+                
+                ai_config = {
+                    'EMBEDDINGS_MODEL': 'sentence-transformers/all-MiniLM-L6-v2',
+                    'VECTOR_STORE_PATH': 'data/vector_stores',
+                    'LLM_MODEL': 'qwen3:4b',
+                    'OLLAMA_BASE_URL': 'http://localhost:11434',
+                    'RERANKER_MODEL': 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+                }
+                
+                ai_pipeline = LangChainService(config=ai_config)
+                
+                # Embed all documents in one batch
+                ai_pipeline.process_documents([doc for doc, _ in sample_docs])
+                for doc, doc_name in sample_docs:
+                    if doc.processing_status == 'completed':
+                        logger.info(f"  ✓ {doc_name} processed through AI pipeline")
                     else:
-                        print(f"  ⚠️  Failed to process {doc_name} through AI pipeline")
-                except Exception as e:
-                    print(f"  ⚠️  Error processing {doc_name}: {e}")
+                        logger.info(f"  ⚠️  Failed to process {doc_name}: {doc.processing_error}")
+                
+                # Persist processing status so the pending-documents job skips them
+                db.session.commit()
                     
-        except Exception as e:
-            print(f"⚠️  Error initializing AI pipeline: {e}")
-            print("   Documents created but not processed for semantic search")
-            print("   You can process them later using the admin interface")
+            except Exception as e:
+                logger.info(f"⚠️  Error initializing AI pipeline: {e}")
+                logger.info("   Documents created but not processed for semantic search")
+                logger.info("   You can process them later using the admin interface")
         
         return True
         
     except Exception as e:
-        print(f"❌ Error creating demo data: {e}")
+        logger.error(f"❌ Error creating demo data: {e}")
         return False
 
 def main():
@@ -263,16 +287,20 @@ def main():
 Examples:
   python init_database.py              # Full initialization (DB + demo data)
   python init_database.py --db-only    # Database tables only
+  python init_database.py --embed-now  # Also index demo documents right away
         """
     )
     parser.add_argument('--db-only', action='store_true', 
                        help='Initialize database tables only (skip demo data)')
+    parser.add_argument('--embed-now', action='store_true',
+                       help='Process demo documents through the AI pipeline immediately')
     
     args = parser.parse_args()
+    setup_logging()
     
-    print("🚀 XU-News-AI-RAG Database Initialization")
-    print("   Version: 1.0")
-    print("   Environment:", os.environ.get('FLASK_ENV', 'development'))
+    logger.info("🚀 XU-News-AI-RAG Database Initialization")
+    logger.info("   Version: 1.0")
+    logger.info(f"   Environment: {os.environ.get('FLASK_ENV', 'development')}")
     
     # Create application
     app = create_app(os.environ.get('FLASK_ENV', 'development'))
@@ -286,30 +314,30 @@ Examples:
         
         # Create demo data if requested
         if success and not args.db_only:
-            if not create_demo_data(app):
+            if not create_demo_data(app, embed_now=args.embed_now):
                 success = False
         elif args.db_only:
-            print("\n✓ Database-only initialization completed!")
+            logger.info("\n✓ Database-only initialization completed!")
         
         # Final status
-        print("\n" + "=" * 60)
+        logger.info("\n" + "=" * 60)
         if success:
-            print("🎉 INITIALIZATION COMPLETED SUCCESSFULLY!")
+            logger.info("🎉 INITIALIZATION COMPLETED SUCCESSFULLY!")
             if not args.db_only:
-                print("\n📋 Demo Account Details:")
-                print("   Username: demo")
-                print("   Password: demo123456")
-                print("   Email: demo@xu-news-ai-rag.com")
-                print("\n💡 Next Steps:")
-                print("   1. Start the backend server: python app.py")
-                print("   2. Start the frontend server: cd ../frontend && npm start")
-                print("   3. Open http://localhost:3000 in your browser")
-                print("   4. Login with the demo account credentials")
+                logger.info("\n📋 Demo Account Details:")
+                logger.info("   Username: demo")
+                logger.info("   Password: demo123456")
+                logger.info("   Email: demo@xu-news-ai-rag.com")
+                logger.info("\n💡 Next Steps:")
+                logger.info("   1. Start the backend server: python app.py")
+                logger.info("   2. Start the frontend server: cd ../frontend && npm start")
+                logger.info("   3. Open http://localhost:3000 in your browser")
+                logger.info("   4. Login with the demo account credentials")
         else:
-            print("❌ INITIALIZATION FAILED!")
-            print("   Please check the error messages above and try again.")
+            logger.error("❌ INITIALIZATION FAILED!")
+            logger.info("   Please check the error messages above and try again.")
             sys.exit(1)
-        print("=" * 60)
+        logger.info("=" * 60)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -7,6 +7,7 @@ import os
 import sys
 import signal
 import logging
+import threading
 from datetime import datetime
 
 # Add the backend directory to Python path
@@ -14,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app, db
 from app.crawlers.scheduler import CrawlerScheduler
+from app.api import sources as sources_api
 from app.api.sources import init_crawler_scheduler
 
 # Setup logging
@@ -31,17 +33,14 @@ logger = logging.getLogger(__name__)
 app = None
 crawler_scheduler = None
 
+# Set by the signal handler; wakes the main loop immediately
+shutdown_event = threading.Event()
+
 
 def signal_handler(signum, frame):
-    """Handle shutdown signals gracefully."""
+    """Handle shutdown signals gracefully (the main loop does the cleanup)."""
     logger.info(f"Received signal {signum}, shutting down gracefully...")
-    
-    if crawler_scheduler and crawler_scheduler.is_running():
-        logger.info("Stopping crawler scheduler...")
-        crawler_scheduler.stop()
-    
-    logger.info("Crawler service stopped.")
-    sys.exit(0)
+    shutdown_event.set()
 
 
 def setup_signal_handlers():
@@ -71,36 +70,34 @@ def main():
         app = create_app(config_name)
         
         with app.app_context():
-            # Initialize database if needed
-            try:
-                db.create_all()
-                logger.info("Database initialized")
-            except Exception as e:
-                logger.warning(f"Database initialization: {e}")
+            # Schema is managed by init_database.py; only create tables on request
+            if os.environ.get('INIT_DB') == '1':
+                try:
+                    db.create_all()
+                    logger.info("Database initialized")
+                except Exception as e:
+                    logger.warning(f"Database initialization: {e}")
             
             # Initialize crawler scheduler
             logger.info("Initializing crawler scheduler...")
             init_crawler_scheduler(app)
+            crawler_scheduler = sources_api.crawler_scheduler
             
             # Keep the service running
             logger.info("✅ Crawler service started successfully!")
             logger.info("Press Ctrl+C to stop the service")
             
-            try:
-                # Keep the main thread alive
-                while True:
-                    import time
-                    time.sleep(60)  # Sleep for 1 minute
-                    
-                    # Periodic health check
-                    if hasattr(app, 'crawler_scheduler'):
-                        scheduler = getattr(app, 'crawler_scheduler')
-                        if not scheduler.is_running():
-                            logger.error("Scheduler stopped unexpectedly!")
-                            break
-                    
-            except KeyboardInterrupt:
-                logger.info("Received shutdown signal...")
+            # Periodic health check; returns as soon as a shutdown signal arrives
+            while not shutdown_event.wait(60):
+                if crawler_scheduler and not crawler_scheduler.is_running():
+                    logger.error("Scheduler stopped unexpectedly!")
+                    break
+            
+            if crawler_scheduler and crawler_scheduler.is_running():
+                logger.info("Stopping crawler scheduler...")
+                crawler_scheduler.stop()
+            
+            logger.info("Crawler service stopped.")
                 
     except Exception as e:
         logger.error(f"Failed to start crawler service: {e}")
@@ -7,7 +7,11 @@ import os
 import sys
 import signal
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from sqlalchemy import select, bindparam
+from sqlalchemy.orm import load_only
 
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -31,12 +35,14 @@ logger = logging.getLogger(__name__)
 app = None
 rss_crawler = None
 
+# Set by the signal handler; wakes the crawl loop immediately
+shutdown_event = threading.Event()
+
 
 def signal_handler(signum, frame):
-    """Handle shutdown signals gracefully."""
+    """Handle shutdown signals gracefully (the crawl loop exits after the current pass)."""
     logger.info(f"Received signal {signum}, shutting down RSS crawler...")
-    logger.info("RSS crawler service stopped.")
-    sys.exit(0)
+    shutdown_event.set()
 
 
 def setup_signal_handlers():
@@ -45,33 +51,74 @@ def setup_signal_handlers():
     signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
 
 
-def crawl_rss_sources():
-    """Crawl all active RSS sources."""
+# Columns crawl_source and update_crawl_stats read or update
+CRAWL_COLUMNS = (
+    Source.id, Source.user_id, Source.name, Source.url,
+    Source.crawl_settings, Source.auto_tags, Source.update_frequency,
+    Source.last_crawled, Source.next_crawl, Source.total_articles,
+    Source.successful_crawls, Source.failed_crawls, Source.last_error
+)
+
+# Statements built once at import; the loop only binds parameters, so every
+# cycle is a compiled-cache hit
+ACTIVE_RSS_SOURCES = select(Source.id, Source.name).where(
+    Source.source_type == 'rss',
+    Source.is_active.is_(True)
+)
+SOURCE_FOR_CRAWL = select(Source).options(load_only(*CRAWL_COLUMNS)).where(
+    Source.id == bindparam('source_id')
+)
+
+
+def crawl_one_source(source_id):
+    """
+    Crawl a single RSS source inside its own application context (worker thread).
+    
+    Returns:
+        Tuple of (success, articles_count, error_message)
+    """
     with app.app_context():
-        # Get only active RSS sources
-        rss_sources = Source.query.filter_by(
-            source_type='rss',
-            is_active=True
-        ).all()
-        
-        if not rss_sources:
-            logger.info("No active RSS sources found")
-            return
+        source = db.session.scalars(SOURCE_FOR_CRAWL, {'source_id': source_id}).first()
+        if not source:
+            return False, 0, 'Source not found'
         
-        logger.info(f"Found {len(rss_sources)} active RSS sources")
+        # Bulk mode: new articles and source stats are written in one transaction
+        return rss_crawler.crawl_source(source, bulk=True)
+
+
+def crawl_rss_sources():
+    """Crawl all active RSS sources concurrently."""
+    with app.app_context():
+        # Get only active RSS sources (ix_sources_type_active)
+        rss_sources = db.session.execute(ACTIVE_RSS_SOURCES).all()
+    
+    if not rss_sources:
+        logger.info("No active RSS sources found")
+        return
+    
+    logger.info(f"Found {len(rss_sources)} active RSS sources")
+    
+    # Feed fetching is network-bound; each worker uses its own app context/session
+    max_workers = max(1, min(app.config.get('CRAWLER_MAX_CONCURRENT_REQUESTS', 5), len(rss_sources)))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(crawl_one_source, source_id): name
+            for source_id, name in rss_sources
+        }
         
-        for source in rss_sources:
+        for future in as_completed(futures):
+            name = futures[future]
             try:
-                logger.info(f"🔄 Crawling: {source.name}")
-                result = rss_crawler.crawl_source(source)
+                success, articles_count, error = future.result()
                 
-                if result['success']:
-                    logger.info(f"✅ {source.name}: {result['total_articles']} articles")
+                if success:
+                    logger.info(f"✅ {name}: {articles_count} articles")
                 else:
-                    logger.error(f"❌ {source.name}: {result.get('error', 'Unknown error')}")
+                    logger.error(f"❌ {name}: {error or 'Unknown error'}")
                     
             except Exception as e:
-                logger.error(f"❌ Error crawling {source.name}: {e}")
+                logger.error(f"❌ Error crawling {name}: {e}")
 
 
 def main():
@@ -92,8 +139,9 @@ def main():
         app = create_app(config_name)
         
         with app.app_context():
-            # Initialize database
-            db.create_all()
+            # Schema is managed by init_database.py; only create tables on request
+            if os.environ.get('INIT_DB') == '1':
+                db.create_all()
             
             # Initialize RSS crawler only
             rss_crawler = RSSCrawler(app.config)
@@ -104,20 +152,19 @@ def main():
             logger.info("Press Ctrl+C to stop")
             
             # Run crawling loop
-            import time
             crawl_interval = 300  # 5 minutes
             
-            while True:
+            while not shutdown_event.is_set():
                 try:
                     crawl_rss_sources()
                     logger.info(f"💤 Sleeping for {crawl_interval // 60} minutes...")
-                    time.sleep(crawl_interval)
+                    shutdown_event.wait(crawl_interval)
                     
-                except KeyboardInterrupt:
-                    break
                 except Exception as e:
                     logger.error(f"Crawling error: {e}")
-                    time.sleep(60)  # Wait 1 minute before retrying
+                    shutdown_event.wait(60)  # Wait 1 minute before retrying
+            
+            logger.info("RSS crawler service stopped.")
                     
     except Exception as e:
         logger.error(f"Failed to start RSS crawler service: {e}")
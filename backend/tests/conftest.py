@@ -5,6 +5,9 @@ import os
 import sys
 import pytest
 from datetime import datetime
+from sqlalchemy import event
+from flask_jwt_extended import create_refresh_token
+from werkzeug.security import generate_password_hash
 
 # Add the parent directory to the path so we can import the app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -15,6 +18,11 @@ from app.models.document import Document
 from app.models.source import Source
 from app.models.tag import Tag
 
+# Hash the fixture passwords once, with few iterations; User.check_password
+# verifies any werkzeug hash format, so fixtures skip set_password's full-cost hash
+_TEST_PASSWORD_HASH = generate_password_hash('StrongTest123!', method='pbkdf2:sha256:1000')
+_SAMPLE_PASSWORD_HASH = generate_password_hash('StrongSample123!', method='pbkdf2:sha256:1000')
+
 
 @pytest.fixture(scope='session')
 def app():
@@ -23,6 +31,17 @@ def app():
     app = create_app('testing')
     
     with app.app_context():
+        # File-backed SQLite (TEST_DATABASE_URL): cut fsyncs from the per-test commits
+        url = db.engine.url
+        if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+            @event.listens_for(db.engine, 'connect')
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute('PRAGMA journal_mode=WAL')
+                cursor.execute('PRAGMA synchronous=NORMAL')
+                cursor.execute('PRAGMA temp_store=MEMORY')
+                cursor.close()
+        
         db.create_all()
         yield app
         db.drop_all()
@@ -37,13 +56,15 @@ def client(app):
 @pytest.fixture(autouse=True)
 def clean_db(app):
     """Clean database before each test."""
-    with app.app_context():
-        # Clear all tables with more thorough cleanup
-        db.session.remove()
-        db.session.close()
-        db.drop_all()
-        db.create_all()
-        db.session.commit()
+    # Runs in the app fixture's context, which stays pushed for the whole
+    # session; removing its session also drops whatever the last test left
+    db.session.remove()
+    
+    # The schema is created once per session; empty the tables instead of
+    # re-running all the DDL (children first to satisfy foreign keys)
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
 
 
 @pytest.fixture
@@ -53,74 +74,82 @@ def runner(app):
 
 
 @pytest.fixture
-def auth_headers(client, request, app):
-    """Create authenticated user and return authorization headers."""
-    import time
-    import random
-    from app.models.user import User
+def auth_user(app):
+    """
+    Create the user that auth_headers authenticates as.
     
-    max_attempts = 3
-    for attempt in range(max_attempts):
-        # Generate unique username for each attempt
-        unique_id = f"{int(time.time()*1000)}_{random.randint(1000, 9999)}"
-        user_data = {
-            'username': f'testuser_{unique_id}',
-            'email': f'test_{unique_id}@example.com',
-            'password': 'StrongTest123!'
-        }
-        
-        # Force clean database state
-        with app.app_context():
-            try:
-                # Explicit session cleanup
-                db.session.expunge_all()
-                db.session.rollback()
-                
-                # Check for and remove existing user
-                existing = User.query.filter_by(username=user_data['username']).first()
-                if existing:
-                    db.session.delete(existing)
-                    db.session.commit()
-            except Exception as e:
-                db.session.rollback()
-                if attempt == max_attempts - 1:
-                    print(f"Database cleanup failed: {e}")
-        
-        # Register the user
-        response = client.post('/api/auth/register', json=user_data)
+    Function-scoped on purpose: clean_db empties every table before each
+    test. The expensive part (password hashing) is precomputed at import.
+    """
+    import uuid
+    
+    with app.app_context():
+        unique_id = uuid.uuid4().hex[:12]
+        user = User(
+            username=f'testuser_{unique_id}',
+            email=f'test_{unique_id}@example.com'
+        )
+        user.password_hash = _TEST_PASSWORD_HASH
+        db.session.add(user)
+        db.session.commit()
         
-        if response.status_code == 201:
-            # Success! Get the token and return
-            token = response.json['access_token']
-            return {'Authorization': f'Bearer {token}'}
+        # Load the attributes so the user is usable outside this context
+        db.session.refresh(user)
+        return user
+
+
+@pytest.fixture
+def auth_headers(app, auth_user):
+    """Return authorization headers for auth_user."""
+    with app.app_context():
+        # Same tokens the register endpoint returns, without the HTTP round-trip
+        token = auth_user.generate_tokens()['access_token']
+        return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def refresh_token(app, auth_user):
+    """Return a refresh token for auth_user, minted directly (no login)."""
+    with app.app_context():
+        # generate_tokens uses the stringified id as the identity
+        return create_refresh_token(identity=str(auth_user.id))
+
+
+@pytest.fixture
+def document_factory(app, auth_user):
+    """
+    Return a function that inserts a document and returns its id.
+    
+    Tests that only need an existing document use this instead of POSTing
+    to /api/content/documents. Documents belong to auth_user unless a
+    user_id is given.
+    
+    Returns:
+        Callable taking Document fields as keyword arguments and returning the new document id
+    """
+    def make(title='Test Document', content='Test content', user_id=None, **fields):
+        fields.update(
+            user_id=user_id if user_id is not None else auth_user.id,
+            title=title,
+            content=content
+        )
         
-        # Registration failed, debug and try again if we have attempts left
-        if attempt == max_attempts - 1:
-            # This was our last attempt, fail with full debug info
-            print(f"Registration failed after {max_attempts} attempts")
-            print(f"Final failure - Status: {response.status_code}")
-            print(f"Response: {response.get_json()}")
-            print(f"Attempted username: {user_data['username']}")
-            print(f"Test: {request.node.name}")
-            
-            with app.app_context():
-                try:
-                    existing_users = User.query.all()
-                    print(f"Existing users in DB: {[u.username for u in existing_users]}")
-                except Exception as e:
-                    print(f"Could not check existing users: {e}")
+        with app.app_context():
+            # Tags go through the association table, which needs the ORM
+            if 'tags' in fields:
+                return Document.create_document(**fields).id
             
-            # Fail the test
-            assert False, f"Registration failed after {max_attempts} attempts: {response.get_json()}"
-        else:
-            # Try again with a small delay
-            time.sleep(0.01)
-            print(f"Registration attempt {attempt + 1} failed, retrying...")
+            # Plain rows skip the ORM object and unit of work entirely
+            result = db.session.execute(Document.__table__.insert(), fields)
+            db.session.commit()
+            return result.inserted_primary_key[0]
+    
+    return make
 
 
 @pytest.fixture
 def sample_user(app):
-    """Create a sample user in the database."""
+    """Create a sample user in the database (per test, see auth_headers)."""
     with app.app_context():
         # Check if user already exists
         existing_user = User.query.filter_by(username='sampleuser').first()
@@ -132,7 +161,7 @@ def sample_user(app):
             username='sampleuser',
             email='sample@example.com'
         )
-        user.set_password('StrongSample123!')
+        user.password_hash = _SAMPLE_PASSWORD_HASH
         db.session.add(user)
         db.session.commit()
         
@@ -143,34 +172,37 @@ def sample_user(app):
 
 @pytest.fixture
 def sample_document(app, sample_user):
-    """Create a sample document in the database."""
-    with app.app_context():
-        document = Document(
-            title='Sample Document',
-            content='This is sample content for testing.',
-            user_id=sample_user.id,
-            source_type='manual',
-            published_date=datetime.utcnow()
-        )
-        db.session.add(document)
-        db.session.commit()
-        return document
+    """
+    Create a sample document in the database.
+    
+    Added through the session-wide context's db.session (reset by clean_db),
+    so tests can modify and commit it directly.
+    """
+    document = Document(
+        title='Sample Document',
+        content='This is sample content for testing.',
+        user_id=sample_user.id,
+        source_type='manual',
+        published_date=datetime.utcnow()
+    )
+    db.session.add(document)
+    db.session.commit()
+    return document
 
 
 @pytest.fixture
 def sample_source(app, sample_user):
-    """Create a sample RSS source in the database."""
-    with app.app_context():
-        source = Source(
-            name='Test RSS Feed',
-            url='https://example.com/rss',
-            source_type='rss',
-            user_id=sample_user.id,
-            is_active=True
-        )
-        db.session.add(source)
-        db.session.commit()
-        return source
+    """Create a sample RSS source in the database (attached like sample_document)."""
+    source = Source(
+        name='Test RSS Feed',
+        url='https://example.com/rss',
+        source_type='rss',
+        user_id=sample_user.id,
+        is_active=True
+    )
+    db.session.add(source)
+    db.session.commit()
+    return source
 
 
 @pytest.fixture
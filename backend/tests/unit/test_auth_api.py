@@ -28,22 +28,15 @@ class TestAuthAPI:
         assert data['user']['username'] == 'newuser'
         assert data['user']['email'] == 'newuser@example.com'
     
-    def test_user_registration_missing_fields(self, client):
+    @pytest.mark.parametrize('missing_field', ['password', 'email'])
+    def test_user_registration_missing_fields(self, client, missing_field):
         """Test registration with missing required fields."""
-        # Missing password
-        user_data = {
-            'username': 'newuser',
-            'email': 'newuser@example.com'
-        }
-        
-        response = client.post('/api/auth/register', json=user_data)
-        assert response.status_code == 400
-        
-        # Missing email
         user_data = {
             'username': 'newuser',
+            'email': 'newuser@example.com',
             'password': 'StrongNew123!'
         }
+        del user_data[missing_field]
         
         response = client.post('/api/auth/register', json=user_data)
         assert response.status_code == 400
@@ -116,49 +109,30 @@ class TestAuthAPI:
         data = response.get_json()
         assert 'access_token' in data
     
-    def test_user_login_invalid_credentials(self, client, sample_user):
+    @pytest.mark.parametrize('existing_user,password', [
+        (True, 'WrongPassword'),      # Wrong password
+        (False, 'AnyStrong123!'),     # Non-existent user
+    ])
+    def test_user_login_invalid_credentials(self, client, request, existing_user, password):
         """Test login with invalid credentials."""
-        # Wrong password
+        # Only the wrong-password case needs sample_user in the database
+        if existing_user:
+            username = request.getfixturevalue('sample_user').username
+        else:
+            username = 'nonexistent'
+        
         login_data = {
-            'username': sample_user.username,
-            'password': 'WrongPassword'
+            'username': username,
+            'password': password
         }
         
         response = client.post('/api/auth/login', json=login_data)
         assert response.status_code == 401
         data = response.get_json()
         assert 'error' in data
-        
-        # Non-existent user
-        login_data = {
-            'username': 'nonexistent',
-            'password': 'AnyStrong123!'
-        }
-        
-        response = client.post('/api/auth/login', json=login_data)
-        assert response.status_code == 401
     
-    def test_token_refresh(self, client, app):
+    def test_token_refresh(self, client, refresh_token):
         """Test token refresh endpoint."""
-        # Create test user
-        with app.app_context():
-            from app.models import User
-            user = User(username='refreshuser', email='refresh@example.com')
-            user.set_password('StrongTest123!')
-            db.session.add(user)
-            db.session.commit()
-        
-        # Login to get refresh token
-        login_data = {
-            'username': 'refreshuser',
-            'password': 'StrongTest123!'
-        }
-        login_response = client.post('/api/auth/login', json=login_data)
-        assert login_response.status_code == 200
-        
-        login_data = login_response.get_json()
-        refresh_token = login_data['refresh_token']
-        
         # Use refresh token to get new access token
         refresh_headers = {'Authorization': f'Bearer {refresh_token}'}
         response = client.post('/api/auth/refresh', headers=refresh_headers)
@@ -166,7 +140,6 @@ class TestAuthAPI:
         assert response.status_code == 200
         data = response.get_json()
         assert 'access_token' in data
-        # New token should be different from the original
     
     def test_get_user_profile(self, client, auth_headers):
         """Test getting user profile."""
@@ -224,14 +197,8 @@ class TestAuthAPI:
         data = response.get_json()
         assert 'error' in data
     
-    def test_change_password(self, client, auth_headers):
+    def test_change_password(self, client, auth_headers, auth_user):
         """Test password change functionality."""
-        # First get the current user's profile to get the username
-        profile_response = client.get('/api/auth/profile', headers=auth_headers)
-        assert profile_response.status_code == 200
-        profile_data = profile_response.get_json()
-        username = profile_data['user']['username']
-        
         password_data = {
             'current_password': 'StrongTest123!',
             'new_password': 'NewStrong456!'
@@ -247,9 +214,9 @@ class TestAuthAPI:
         
         assert response.status_code == 200
         
-        # Try logging in with new password using the actual username
+        # Try logging in with new password as the user auth_headers is for
         login_data = {
-            'username': username,
+            'username': auth_user.username,
             'password': 'NewStrong456!'
         }
         
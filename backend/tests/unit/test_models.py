@@ -2,335 +2,360 @@
 Unit tests for database models.
 """
 import pytest
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.models.document import Document
 from app.models.source import Source
 from app.models.tag import Tag
 from app.models.search_history import SearchHistory
+from app.models.crawler_metric import CrawlerMetric
 from app import db
 
 
 class TestUserModel:
     """Test User model functionality."""
     
-    def test_create_user(self, app):
+    def test_create_user(self):
         """Test creating a new user."""
-        with app.app_context():
-            user = User(
-                username='newuser',
-                email='new@example.com'
-            )
-            user.set_password('Password123!')
-            
-            assert user.username == 'newuser'
-            assert user.email == 'new@example.com'
-            assert user.check_password('Password123!')
-            assert not user.check_password('WrongPassword')
-            
-            db.session.add(user)
-            db.session.commit()
-            
-            # Verify user was saved
-            saved_user = User.query.filter_by(username='newuser').first()
-            assert saved_user is not None
-            assert saved_user.email == 'new@example.com'
+        user = User(
+            username='newuser',
+            email='new@example.com'
+        )
+        user.set_password('Password123!')
+        
+        assert user.username == 'newuser'
+        assert user.email == 'new@example.com'
+        assert user.check_password('Password123!')
+        assert not user.check_password('WrongPassword')
+        
+        db.session.add(user)
+        db.session.commit()
+        
+        # Verify user was saved
+        assert user.id is not None
     
-    def test_user_unique_constraints(self, app, sample_user):
+    def test_user_unique_constraints(self, sample_user):
         """Test that username and email must be unique."""
-        with app.app_context():
-            # Try to create a user with duplicate username
-            duplicate_user = User(
-                username=sample_user.username,
-                email='different@example.com'
-            )
-            duplicate_user.set_password('Password123!')
-            
-            db.session.add(duplicate_user)
-            with pytest.raises(Exception):  # Should raise IntegrityError
-                db.session.commit()
-            db.session.rollback()
-            
-            # Try to create a user with duplicate email
-            duplicate_email_user = User(
-                username='differentuser',
-                email=sample_user.email
-            )
-            duplicate_email_user.set_password('Password123!')
-            
-            db.session.add(duplicate_email_user)
-            with pytest.raises(Exception):  # Should raise IntegrityError
-                db.session.commit()
+        # Try to create a user with duplicate username
+        duplicate_user = User(
+            username=sample_user.username,
+            email='different@example.com'
+        )
+        duplicate_user.set_password('Password123!')
+        
+        db.session.add(duplicate_user)
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+        
+        # Try to create a user with duplicate email
+        duplicate_email_user = User(
+            username='differentuser',
+            email=sample_user.email
+        )
+        duplicate_email_user.set_password('Password123!')
+        
+        db.session.add(duplicate_email_user)
+        with pytest.raises(IntegrityError):
+            db.session.commit()
     
-    def test_user_to_dict(self, app, sample_user):
+    def test_user_to_dict(self, sample_user):
         """Test user serialization."""
-        with app.app_context():
-            user_dict = sample_user.to_dict(include_sensitive=True)
-            
-            assert 'id' in user_dict
-            assert 'username' in user_dict
-            assert 'email' in user_dict
-            assert 'password_hash' not in user_dict  # Should not expose password
-            assert user_dict['username'] == sample_user.username
-            assert user_dict['email'] == sample_user.email
+        user_dict = sample_user.to_dict(include_sensitive=True)
+        
+        assert 'id' in user_dict
+        assert 'username' in user_dict
+        assert 'email' in user_dict
+        assert 'password_hash' not in user_dict  # Should not expose password
+        assert user_dict['username'] == sample_user.username
+        assert user_dict['email'] == sample_user.email
 
 
 class TestDocumentModel:
     """Test Document model functionality."""
     
-    def test_create_document(self, app, sample_user):
+    def test_create_document(self, sample_user):
         """Test creating a new document."""
-        with app.app_context():
-            document = Document(
-                title='Test Document',
-                content='Test content',
-                user_id=sample_user.id,
-                source_type='manual',
-                source_url='https://example.com',
-                published_date=datetime.utcnow()
-            )
-            
-            db.session.add(document)
-            db.session.commit()
-            
-            assert document.id is not None
-            assert document.title == 'Test Document'
-            assert document.content == 'Test content'
-            assert document.user_id == sample_user.id
-            
-            # Test relationship
-            assert document.owner.id == sample_user.id
+        document = Document(
+            title='Test Document',
+            content='Test content',
+            user_id=sample_user.id,
+            source_type='manual',
+            source_url='https://example.com',
+            published_date=datetime.utcnow()
+        )
+        
+        db.session.add(document)
+        db.session.commit()
+        
+        assert document.id is not None
+        assert document.title == 'Test Document'
+        assert document.content == 'Test content'
+        assert document.user_id == sample_user.id
+        
+        # Test relationship
+        assert document.owner.id == sample_user.id
     
-    def test_document_with_tags(self, app, sample_user, sample_tags):
+    def test_document_with_tags(self, sample_user, sample_tags):
         """Test document-tag relationship."""
-        with app.app_context():
-            document = Document(
-                title='Document with Tags',
-                content='Content with tags',
-                user_id=sample_user.id
-            )
-            
-            # Add tags to document
-            document.tags.extend(sample_tags[:2])  # Add first two tags
-            
-            db.session.add(document)
-            db.session.commit()
-            
-            # Verify tags were added
-            saved_doc = Document.query.filter_by(title='Document with Tags').first()
-            assert len(saved_doc.tags) == 2
-            assert sample_tags[0] in saved_doc.tags
-            assert sample_tags[1] in saved_doc.tags
+        document = Document(
+            title='Document with Tags',
+            content='Content with tags',
+            user_id=sample_user.id
+        )
+        
+        # Add tags to document
+        document.tags.extend(sample_tags[:2])  # Add first two tags
+        
+        db.session.add(document)
+        db.session.commit()
+        
+        # Verify tags were added (the commit expired document, so this reloads them)
+        assert len(document.tags) == 2
+        assert sample_tags[0] in document.tags
+        assert sample_tags[1] in document.tags
     
-    def test_document_to_dict(self, app, sample_user):
+    def test_document_to_dict(self, sample_document):
         """Test document serialization."""
-        with app.app_context():
-            # Create document within test context to avoid DetachedInstanceError
-            document = Document(
-                title='Test Document',
-                content='Test content for serialization',
-                user_id=sample_user.id,
-                source_type='manual',
-                published_date=datetime.utcnow()
-            )
-            db.session.add(document)
-            db.session.commit()
-            
-            doc_dict = document.to_dict()
-            
-            assert 'id' in doc_dict
-            assert 'title' in doc_dict
-            assert 'content' in doc_dict
-            assert 'created_at' in doc_dict
-            assert 'content_type' in doc_dict
-            assert doc_dict['title'] == 'Test Document'
+        document = sample_document
+        
+        doc_dict = document.to_dict()
+        
+        assert 'id' in doc_dict
+        assert 'title' in doc_dict
+        assert 'content' in doc_dict
+        assert 'created_at' in doc_dict
+        assert 'content_type' in doc_dict
+        assert doc_dict['title'] == 'Sample Document'
 
 
 class TestSourceModel:
     """Test Source model functionality."""
     
-    def test_create_source(self, app, sample_user):
+    def test_create_source(self, sample_user):
         """Test creating a new source."""
-        with app.app_context():
-            source = Source(
-                name='Test Source',
-                url='https://test.com/rss',
-                source_type='rss',
-                user_id=sample_user.id,
-                is_active=True,
-                update_frequency=30
-            )
-            
-            db.session.add(source)
-            db.session.commit()
-            
-            assert source.id is not None
-            assert source.name == 'Test Source'
-            assert source.url == 'https://test.com/rss'
-            assert source.is_active == True
-            assert source.update_frequency == 30
+        source = Source(
+            name='Test Source',
+            url='https://test.com/rss',
+            source_type='rss',
+            user_id=sample_user.id,
+            is_active=True,
+            update_frequency=30
+        )
+        
+        db.session.add(source)
+        db.session.commit()
+        
+        assert source.id is not None
+        assert source.name == 'Test Source'
+        assert source.url == 'https://test.com/rss'
+        assert source.is_active == True
+        assert source.update_frequency == 30
     
-    def test_source_deactivation(self, app, sample_user):
+    def test_source_deactivation(self, sample_source):
         """Test source activation/deactivation."""
-        with app.app_context():
-            # Create source within test context to avoid DetachedInstanceError
-            source = Source(
-                name='Test Source',
-                url='https://test.com/rss',
-                source_type='rss',
-                user_id=sample_user.id,
-                is_active=True
-            )
-            db.session.add(source)
-            db.session.commit()
-            source_id = source.id
-            
-            # Initially active
-            assert source.is_active == True
-            
-            # Deactivate
-            source.is_active = False
-            db.session.commit()
-            
-            # Verify deactivation
-            updated_source = Source.query.get(source_id)
-            assert updated_source.is_active == False
+        source = sample_source
+        source_id = source.id
+        
+        # Initially active
+        assert source.is_active == True
+        
+        # Deactivate
+        source.is_active = False
+        db.session.commit()
+        
+        # Verify deactivation
+        updated_source = Source.query.get(source_id)
+        assert updated_source.is_active == False
     
-    def test_source_to_dict(self, app, sample_user):
+    def test_source_to_dict(self, sample_source):
         """Test source serialization."""
-        with app.app_context():
-            # Create source within test context to avoid DetachedInstanceError
-            source = Source(
-                name='Test Source Serialization',
-                url='https://test-serialize.com/rss',
-                source_type='rss',
-                user_id=sample_user.id,
-                is_active=True
-            )
-            db.session.add(source)
-            db.session.commit()
-            
-            source_dict = source.to_dict()
-            
-            assert 'id' in source_dict
-            assert 'name' in source_dict
-            assert 'url' in source_dict
-            assert 'source_type' in source_dict
-            assert 'is_active' in source_dict
-            assert source_dict['name'] == 'Test Source Serialization'
+        source = sample_source
+        
+        source_dict = source.to_dict()
+        
+        assert 'id' in source_dict
+        assert 'name' in source_dict
+        assert 'url' in source_dict
+        assert 'source_type' in source_dict
+        assert 'is_active' in source_dict
+        assert source_dict['name'] == 'Test RSS Feed'
+    
+    def test_source_crawl_priority(self):
+        """Test overdue and productive sources are ranked first."""
+        now = datetime.utcnow()
+        
+        fresh = Source(update_frequency=60, total_articles=10, last_crawled=now - timedelta(minutes=30))
+        overdue = Source(update_frequency=60, total_articles=10, last_crawled=now - timedelta(hours=3))
+        productive = Source(update_frequency=60, total_articles=500, last_crawled=now - timedelta(hours=3))
+        never_crawled = Source(update_frequency=60, total_articles=0, created_at=now)
+        
+        assert overdue.crawl_priority(now) > fresh.crawl_priority(now)
+        assert productive.crawl_priority(now) > overdue.crawl_priority(now)
+        assert never_crawled.crawl_priority(now) > 0
+
+
+class TestCrawlerMetricModel:
+    """Test CrawlerMetric model functionality."""
+    
+    def test_record_accumulates_into_todays_row(self, sample_source):
+        """Test repeated records add to a single row per source and day."""
+        CrawlerMetric.record(sample_source.id, conditional_hits=1, bytes_saved=500)
+        CrawlerMetric.record(sample_source.id, conditional_hits=2, conditional_misses=1, bytes_saved=250)
+        db.session.commit()
+        
+        metrics = CrawlerMetric.query.filter_by(source_id=sample_source.id).all()
+        assert len(metrics) == 1
+        assert metrics[0].date == date.today()
+        assert metrics[0].conditional_hits == 3
+        assert metrics[0].conditional_misses == 1
+        assert metrics[0].bytes_saved == 750
+        assert metrics[0].get_hit_rate() == 75.0
+    
+    def test_record_skips_empty_counters(self, sample_source):
+        """Test recording nothing does not create a row."""
+        assert CrawlerMetric.record(sample_source.id) is None
+        assert CrawlerMetric.query.count() == 0
+    
+    def test_get_totals(self, sample_source):
+        """Test totals and hit rate, with and without a start date."""
+        old = CrawlerMetric(
+            source_id=sample_source.id,
+            date=date.today() - timedelta(days=10),
+            conditional_hits=0,
+            conditional_misses=4,
+            bytes_saved=0
+        )
+        db.session.add(old)
+        CrawlerMetric.record(sample_source.id, conditional_hits=3, conditional_misses=1, bytes_saved=1000)
+        db.session.commit()
+        
+        totals = CrawlerMetric.get_totals()
+        assert totals['conditional_hits'] == 3
+        assert totals['conditional_misses'] == 5
+        assert totals['bytes_saved'] == 1000
+        assert totals['hit_rate'] == 37.5
+        
+        recent = CrawlerMetric.get_totals(since=date.today() - timedelta(days=7))
+        assert recent['conditional_misses'] == 1
+        assert recent['hit_rate'] == 75.0
+    
+    def test_get_totals_empty(self):
+        """Test totals are zero when nothing was recorded."""
+        totals = CrawlerMetric.get_totals()
+        assert totals == {
+            'conditional_hits': 0,
+            'conditional_misses': 0,
+            'bytes_saved': 0,
+            'hit_rate': 0.0,
+        }
 
 
 class TestTagModel:
     """Test Tag model functionality."""
     
-    def test_create_tag(self, app):
+    def test_create_tag(self):
         """Test creating a new tag."""
-        with app.app_context():
-            tag = Tag(name='newtag')
-            
-            db.session.add(tag)
-            db.session.commit()
-            
-            assert tag.id is not None
-            assert tag.name == 'newtag'
-            
-            # Verify tag was saved
-            saved_tag = Tag.query.filter_by(name='newtag').first()
-            assert saved_tag is not None
+        tag = Tag(name='newtag')
+        
+        db.session.add(tag)
+        db.session.commit()
+        
+        assert tag.id is not None
+        assert tag.name == 'newtag'
     
-    def test_tag_unique_constraint(self, app):
+    def test_tag_unique_constraint(self):
         """Test that tag names must be unique."""
-        with app.app_context():
-            tag1 = Tag(name='uniquetag')
-            db.session.add(tag1)
+        tag1 = Tag(name='uniquetag')
+        db.session.add(tag1)
+        db.session.commit()
+        
+        # Try to create duplicate tag
+        tag2 = Tag(name='uniquetag')
+        db.session.add(tag2)
+        
+        with pytest.raises(IntegrityError):
             db.session.commit()
-            
-            # Try to create duplicate tag
-            tag2 = Tag(name='uniquetag')
-            db.session.add(tag2)
-            
-            with pytest.raises(Exception):  # Should raise IntegrityError
-                db.session.commit()
     
-    def test_tag_documents_relationship(self, app, sample_tags, sample_user):
+    def test_tag_documents_relationship(self, sample_tags, sample_user):
         """Test tag-document relationship."""
-        with app.app_context():
-            # Create documents with tags
-            doc1 = Document(
-                title='Doc 1',
-                content='Content 1',
-                user_id=sample_user.id
-            )
-            doc1.tags.append(sample_tags[0])
-            
-            doc2 = Document(
-                title='Doc 2', 
-                content='Content 2',
-                user_id=sample_user.id
-            )
-            doc2.tags.append(sample_tags[0])
-            
-            db.session.add_all([doc1, doc2])
-            db.session.commit()
-            
-            # Verify tag has both documents
-            tag = Tag.query.get(sample_tags[0].id)
-            assert len(tag.documents) == 2
+        # Create documents with tags
+        doc1 = Document(
+            title='Doc 1',
+            content='Content 1',
+            user_id=sample_user.id
+        )
+        doc1.tags.append(sample_tags[0])
+        
+        doc2 = Document(
+            title='Doc 2', 
+            content='Content 2',
+            user_id=sample_user.id
+        )
+        doc2.tags.append(sample_tags[0])
+        
+        db.session.add_all([doc1, doc2])
+        db.session.commit()
+        
+        # Verify tag has both documents
+        tag = Tag.query.get(sample_tags[0].id)
+        assert len(tag.documents) == 2
 
 
 class TestSearchHistoryModel:
     """Test SearchHistory model functionality."""
     
-    def test_create_search_history(self, app, sample_user):
+    def test_create_search_history(self, sample_user):
         """Test creating search history entry."""
-        with app.app_context():
-            search = SearchHistory(
-                user_id=sample_user.id,
-                query='test search query',
-                results_count=5,
-                query_type='semantic'
-            )
-            
-            db.session.add(search)
-            db.session.commit()
-            
-            assert search.id is not None
-            assert search.query == 'test search query'
-            assert search.results_count == 5
-            assert search.query_type == 'semantic'
-            assert search.user_id == sample_user.id
+        search = SearchHistory(
+            user_id=sample_user.id,
+            query='test search query',
+            results_count=5,
+            query_type='semantic'
+        )
+        
+        # Flushing assigns the id; no commit (or post-commit reload) needed
+        db.session.add(search)
+        db.session.flush()
+        
+        assert search.id is not None
+        assert search.query == 'test search query'
+        assert search.results_count == 5
+        assert search.query_type == 'semantic'
+        assert search.user_id == sample_user.id
     
-    def test_search_history_timestamps(self, app, sample_user):
+    def test_search_history_timestamps(self, sample_user):
         """Test that timestamps are automatically set."""
-        with app.app_context():
-            search = SearchHistory(
-                user_id=sample_user.id,
-                query='timestamp test',
-                results_count=0
-            )
-            
-            db.session.add(search)
-            db.session.commit()
-            
-            assert search.created_at is not None
-            assert isinstance(search.created_at, datetime)
+        search = SearchHistory(
+            user_id=sample_user.id,
+            query='timestamp test',
+            results_count=0
+        )
+        
+        # Column defaults are applied at flush
+        db.session.add(search)
+        db.session.flush()
+        
+        assert search.created_at is not None
+        assert isinstance(search.created_at, datetime)
     
-    def test_user_search_history_relationship(self, app, sample_user):
+    def test_user_search_history_relationship(self, sample_user):
         """Test user-search history relationship."""
-        with app.app_context():
-            # Create multiple search entries
-            searches = [
-                SearchHistory(
-                    user_id=sample_user.id,
-                    query=f'query {i}',
-                    results_count=i
-                )
-                for i in range(3)
-            ]
-            
-            db.session.add_all(searches)
-            db.session.commit()
-            
-            # Verify user has all search entries
-            user = User.query.get(sample_user.id)
-            assert len(user.search_history.all()) == 3
+        # Create multiple search entries
+        searches = [
+            SearchHistory(
+                user_id=sample_user.id,
+                query=f'query {i}',
+                results_count=i
+            )
+            for i in range(3)
+        ]
+        
+        # No relationships to cascade, so skip the unit-of-work bookkeeping
+        db.session.bulk_save_objects(searches)
+        db.session.commit()
+        
+        # Verify user has all search entries
+        user = User.query.get(sample_user.id)
+        assert user.search_history.count() == 3
@@ -0,0 +1,52 @@
+"""
+Unit tests for the crawler scheduler's maintenance jobs.
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db
+from app.models.document import Document
+from app.crawlers.rss_crawler import RSSCrawler
+from app.crawlers.scheduler import CrawlerScheduler
+
+
+@pytest.fixture
+def crawler_scheduler(app):
+    """Create a scheduler bound to the test app (never started)."""
+    return CrawlerScheduler(app.config, app=app)
+
+
+class TestProcessPendingDocumentsTask:
+    """Test the pending document indexing job."""
+    
+    def test_indexes_pending_documents(self, crawler_scheduler, document_factory):
+        """Test old pending documents are handed to the AI pipeline in one batch."""
+        pending_id = document_factory(
+            title='Pending', created_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        document_factory(title='Fresh')  # Too new: may still be processing inline
+        
+        # Record the ids while the job's session is still open
+        indexed = []
+        
+        def index_documents(documents):
+            indexed.append([document.id for document in documents])
+            return len(documents)
+        
+        with patch.object(RSSCrawler, 'index_documents', side_effect=index_documents):
+            crawler_scheduler._process_pending_documents_task()
+        
+        assert indexed == [[pending_id]]
+    
+    def test_marks_documents_failed_without_pipeline(self, crawler_scheduler, document_factory):
+        """Test documents are not left pending when no AI pipeline is available."""
+        pending_id = document_factory(
+            title='Pending', created_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        
+        with patch.object(RSSCrawler, 'index_documents', return_value=None):
+            crawler_scheduler._process_pending_documents_task()
+        
+        document = db.session.get(Document, pending_id)
+        assert document.processing_status == 'failed'
+        assert document.processing_error == 'AI pipeline not available'
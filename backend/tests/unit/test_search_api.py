@@ -3,11 +3,25 @@ Unit tests for search API endpoints.
 """
 import pytest
 import json
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 from app import db
 from app.models.document import Document
 from app.models.search_history import SearchHistory
 
+# Fixed request bodies for the validation/auth tests, serialized once
+MISSING_QUERY_BODY = json.dumps({'limit': 5})
+EMPTY_QUERY_BODY = json.dumps({'query': '', 'limit': 5})
+UNAUTHORIZED_SEARCH_BODY = json.dumps({'query': 'unauthorized search', 'limit': 5})
+
+
+def _stub_pipeline(results):
+    """Return a plain stand-in for the AI pipeline whose searches return ``results``."""
+    return SimpleNamespace(
+        semantic_search=lambda *args, **kwargs: results,
+        semantic_search_with_reranking=lambda *args, **kwargs: results
+    )
+
 
 class TestSearchAPI:
     """Test search API endpoints."""
@@ -17,9 +31,7 @@ class TestSearchAPI:
     def test_semantic_search_basic(self, mock_ai_pipeline, client, auth_headers):
         """Test basic semantic search functionality."""
         # Mock the AI pipeline response
-        mock_pipeline = MagicMock()
-        mock_ai_pipeline.return_value = mock_pipeline
-        mock_pipeline.semantic_search.return_value = [
+        mock_ai_pipeline.return_value = _stub_pipeline([
             {
                 'document_id': 1,
                 'title': 'Test Document',
@@ -27,7 +39,7 @@ class TestSearchAPI:
                 'similarity_score': 0.95,
                 'metadata': {}
             }
-        ]
+        ])
         
         search_data = {
             'query': 'test search query',
@@ -47,13 +59,10 @@ class TestSearchAPI:
     
     def test_semantic_search_missing_query(self, client, auth_headers):
         """Test semantic search with missing query."""
-        search_data = {
-            'limit': 5
-        }
-        
         response = client.post('/api/search/semantic',
                               headers=auth_headers,
-                              json=search_data)
+                              data=MISSING_QUERY_BODY,
+                              content_type='application/json')
         
         assert response.status_code == 400
         data = response.get_json()
@@ -61,14 +70,10 @@ class TestSearchAPI:
     
     def test_semantic_search_empty_query(self, client, auth_headers):
         """Test semantic search with empty query."""
-        search_data = {
-            'query': '',
-            'limit': 5
-        }
-        
         response = client.post('/api/search/semantic',
                               headers=auth_headers,
-                              json=search_data)
+                              data=EMPTY_QUERY_BODY,
+                              content_type='application/json')
         
         assert response.status_code == 400
         data = response.get_json()
@@ -78,9 +83,7 @@ class TestSearchAPI:
     @patch('app.ai.langchain_service.LangChainService')
     def test_semantic_search_with_filters(self, mock_ai_pipeline, client, auth_headers):
         """Test semantic search with filters."""
-        mock_pipeline = MagicMock()
-        mock_ai_pipeline.return_value = mock_pipeline
-        mock_pipeline.semantic_search.return_value = []
+        mock_ai_pipeline.return_value = _stub_pipeline([])
         
         search_data = {
             'query': 'filtered search',
@@ -105,9 +108,7 @@ class TestSearchAPI:
     @patch('app.ai.langchain_service.LangChainService')
     def test_semantic_search_with_reranking(self, mock_ai_pipeline, client, auth_headers):
         """Test semantic search with reranking enabled."""
-        mock_pipeline = MagicMock()
-        mock_ai_pipeline.return_value = mock_pipeline
-        mock_pipeline.semantic_search_with_reranking.return_value = [
+        mock_ai_pipeline.return_value = _stub_pipeline([
             {
                 'document_id': 1,
                 'title': 'Reranked Document',
@@ -115,7 +116,7 @@ class TestSearchAPI:
                 'similarity_score': 0.98,
                 'rerank_score': 0.99
             }
-        ]
+        ])
         
         search_data = {
             'query': 'test with reranking',
@@ -131,29 +132,28 @@ class TestSearchAPI:
         data = response.get_json()
         assert 'results' in data
     
-    def test_search_suggestions(self, client, auth_headers, app):
+    def test_search_suggestions(self, client, auth_headers, auth_user):
         """Test search suggestions endpoint."""
-        with app.app_context():
-            # Add some search history for suggestions
-            searches = [
-                SearchHistory(
-                    user_id=1,  # Assuming test user has ID 1
-                    query='machine learning',
-                    results_count=5
-                ),
-                SearchHistory(
-                    user_id=1,
-                    query='machine vision',
-                    results_count=3
-                ),
-                SearchHistory(
-                    user_id=1,
-                    query='deep learning',
-                    results_count=7
-                )
-            ]
-            db.session.add_all(searches)
-            db.session.commit()
+        # Add some search history for suggestions
+        searches = [
+            SearchHistory(
+                user_id=auth_user.id,
+                query='machine learning',
+                results_count=5
+            ),
+            SearchHistory(
+                user_id=auth_user.id,
+                query='machine vision',
+                results_count=3
+            ),
+            SearchHistory(
+                user_id=auth_user.id,
+                query='deep learning',
+                results_count=7
+            )
+        ]
+        db.session.bulk_save_objects(searches)
+        db.session.commit()
         
         response = client.get('/api/search/suggestions?q=mach',
                              headers=auth_headers)
@@ -228,19 +228,25 @@ class TestSearchAPI:
         # Should include external results
     
     @pytest.mark.skip(reason="Skipping streaming response test")
-    def test_search_rate_limiting(self, client, auth_headers):
+    def test_search_rate_limiting(self, client, auth_headers, app):
         """Test that search endpoints have rate limiting."""
-        search_data = {
+        # Don't spend 20 requests finding out there is no limiter to hit
+        if 'limiter' not in app.extensions or not app.config.get('RATELIMIT_ENABLED', True):
+            pytest.skip("Rate limiting not enabled")
+        
+        # Serialized once; every request sends the same body
+        search_body = json.dumps({
             'query': 'rate limit test',
             'limit': 5
-        }
+        })
         
         # Make multiple rapid requests
         responses = []
         for _ in range(20):  # Make 20 rapid requests
             response = client.post('/api/search/semantic',
                                   headers=auth_headers,
-                                  json=search_data)
+                                  data=search_body,
+                                  content_type='application/json')
             responses.append(response.status_code)
         
         # At some point, should hit rate limit (429 status)
@@ -283,12 +289,9 @@ class TestSearchAPI:
     
     def test_search_unauthorized(self, client):
         """Test search endpoints without authentication."""
-        search_data = {
-            'query': 'unauthorized search',
-            'limit': 5
-        }
-        
-        response = client.post('/api/search/semantic', json=search_data)
+        response = client.post('/api/search/semantic',
+                              data=UNAUTHORIZED_SEARCH_BODY,
+                              content_type='application/json')
         
         assert response.status_code == 401
         data = response.get_json()
@@ -321,11 +324,9 @@ class TestSearchAPI:
     
     @pytest.mark.skip(reason="SearchHistory model has attribute issues")
     @patch('app.ai.langchain_service.LangChainService')
-    def test_search_saves_history(self, mock_ai_pipeline, client, auth_headers, app):
+    def test_search_saves_history(self, mock_ai_pipeline, client, auth_headers):
         """Test that searches are saved to history."""
-        mock_pipeline = MagicMock()
-        mock_ai_pipeline.return_value = mock_pipeline
-        mock_pipeline.semantic_search.return_value = []
+        mock_ai_pipeline.return_value = _stub_pipeline([])
         
         search_data = {
             'query': 'history test query',
@@ -339,10 +340,9 @@ class TestSearchAPI:
         assert response.status_code == 200
         
         # Check if search was saved to history
-        with app.app_context():
-            history = SearchHistory.query.filter_by(
-                query='history test query'
-            ).first()
-            # History might not be saved depending on implementation
-            if history:
-                assert history.query == 'history test query'
+        history = SearchHistory.query.filter_by(
+            query='history test query'
+        ).first()
+        # History might not be saved depending on implementation
+        if history:
+            assert history.query == 'history test query'
@@ -2,8 +2,6 @@
 Unit tests for utility functions and validators.
 """
 import pytest
-import time
-from unittest.mock import MagicMock, patch
 from werkzeug.datastructures import FileStorage
 import io
 from app.utils.validators import (
@@ -12,6 +10,7 @@ from app.utils.validators import (
     validate_username,
     sanitize_html_content,
     validate_url,
+    _validate_url,
     validate_file_upload,
     validate_search_query,
     validate_tag_name
@@ -24,6 +23,90 @@ from app.utils.decorators import (
 )
 
 
+# Validator cases, one parametrized test item each
+VALID_PASSWORDS = [
+    'StrongPass123!',
+    'SecurePass@2024',
+    'MyP@ssw0rd',
+    'Test$789Pass'
+]
+INVALID_PASSWORDS = [
+    ('short', 'Too short'),
+    ('password123!', 'No uppercase'),
+    ('PASSWORD123!', 'No lowercase'),
+    ('Password!', 'No digit'),
+    ('Password123', 'No special character'),
+    ('', 'Empty password'),
+]
+
+# Valid usernames (assuming: 3-50 chars, alphanumeric and underscore/hyphen)
+VALID_USERNAMES = [
+    'user123',
+    'john_doe',
+    'test-user',
+    'User_Name_123',
+    'abc'  # Minimum length
+]
+INVALID_USERNAMES = [
+    ('ab', 'Too short'),
+    ('a' * 51, 'Too long'),
+    ('user@123', 'Invalid character @'),
+    ('user name', 'Contains space'),
+    ('user.name', 'Contains period'),
+    ('', 'Empty username'),
+    (None, 'None username')
+]
+
+# Valid URLs (note: the actual function rejects localhost for security)
+VALID_URLS = [
+    'https://example.com',
+    'http://subdomain.example.co.uk/path',
+    'https://example.com/path?query=value',
+]
+INVALID_URLS = [
+    'not a url',
+    'javascript:alert(1)',
+    'data:text/html,<script>alert(1)</script>',
+    '//example.com',  # Missing protocol
+    'example.com',  # Missing protocol
+    'http://localhost:8080',  # Rejected by security check
+    'https://192.168.1.1',  # Rejected by security check
+]
+
+VALID_QUERIES = [
+    'simple search',
+    'machine learning',
+    'search with numbers 123'
+]
+INVALID_QUERIES = [
+    'union select * from users',
+    '<script>alert(1)</script>',
+    'drop table documents',
+    '',
+    ' ' * 1001  # Too long
+]
+
+VALID_TAGS = [
+    'technology',
+    'machine-learning',
+    'data_science',
+    'AI ML'
+]
+INVALID_TAGS = [
+    '',
+    'a',  # Too short
+    'a' * 51,  # Too long
+    '-starts-with-dash',
+    'ends-with-dash-',
+    'tag@special',  # Invalid character
+    'double  spaces'
+]
+
+# Upload constraints shared by the file validation tests
+ALLOWED_EXTENSIONS = frozenset({'txt', 'pdf', 'docx', 'csv'})
+MAX_UPLOAD_SIZE = 1024 * 1024  # 1 MB
+
+
 class TestValidators:
     """Test validation functions."""
     
@@ -44,65 +127,29 @@ class TestValidators:
         assert validate_email('') == False
         assert validate_email(None) == False
     
-    def test_validate_password_strength(self):
+    @pytest.mark.parametrize('password', VALID_PASSWORDS)
+    def test_validate_password_strength(self, password):
         """Test password strength validation."""
-        # Valid passwords
-        valid_passwords = [
-            'StrongPass123!',
-            'SecurePass@2024',
-            'MyP@ssw0rd',
-            'Test$789Pass'
-        ]
-        
-        for password in valid_passwords:
-            result, message = validate_password_strength(password)
-            assert result == True, f"Password '{password}' should be valid: {message}"
-        
-        # Invalid passwords
-        invalid_passwords = [
-            ('short', 'Too short'),
-            ('password123!', 'No uppercase'),
-            ('PASSWORD123!', 'No lowercase'),
-            ('Password!', 'No digit'),
-            ('Password123', 'No special character'),
-            ('', 'Empty password'),
-        ]
-        
-        for password, reason in invalid_passwords:
-            if password is None:
-                continue  # Skip None test as function expects string
-            result, message = validate_password_strength(password)
-            assert result == False, f"Password '{password}' should be invalid ({reason}): {message}"
+        result, message = validate_password_strength(password)
+        assert result == True, f"Password '{password}' should be valid: {message}"
     
-    def test_validate_username(self):
+    @pytest.mark.parametrize('password,reason', INVALID_PASSWORDS)
+    def test_validate_password_strength_invalid(self, password, reason):
+        """Test weak passwords are rejected."""
+        result, message = validate_password_strength(password)
+        assert result == False, f"Password '{password}' should be invalid ({reason}): {message}"
+    
+    @pytest.mark.parametrize('username', VALID_USERNAMES)
+    def test_validate_username(self, username):
         """Test username validation."""
-        # Valid usernames (assuming: 3-50 chars, alphanumeric and underscore/hyphen)
-        valid_usernames = [
-            'user123',
-            'john_doe',
-            'test-user',
-            'User_Name_123',
-            'abc'  # Minimum length
-        ]
-        
-        for username in valid_usernames:
-            result, message = validate_username(username)
-            assert result == True, f"Username '{username}' should be valid: {message}"
-        
-        # Invalid usernames
-        invalid_usernames = [
-            ('ab', 'Too short'),
-            ('a' * 51, 'Too long'),
-            ('user@123', 'Invalid character @'),
-            ('user name', 'Contains space'),
-            ('user.name', 'Contains period'),
-            ('', 'Empty username'),
-            (None, 'None username')
-        ]
-        
-        for username, reason in invalid_usernames:
-            result, message = validate_username(username)
-            assert result == False, f"Username '{username}' should be invalid ({reason})"
+        result, message = validate_username(username)
+        assert result == True, f"Username '{username}' should be valid: {message}"
+    
+    @pytest.mark.parametrize('username,reason', INVALID_USERNAMES)
+    def test_validate_username_invalid(self, username, reason):
+        """Test invalid usernames are rejected."""
+        result, message = validate_username(username)
+        assert result == False, f"Username '{username}' should be invalid ({reason})"
     
     def test_sanitize_html_content(self):
         """Test HTML content sanitization."""
@@ -128,99 +175,74 @@ class TestValidators:
         clean = sanitize_html_content(safe_html)
         assert 'safe' in clean
         
+        # Test plain text (entities decoded, then escaped once)
+        assert sanitize_html_content('  Fish &amp; Chips  ') == 'Fish &amp; Chips'
+        
         # Test empty and None inputs
         assert sanitize_html_content('') == ''
         assert sanitize_html_content(None) == ''
     
-    def test_validate_url(self):
+    @pytest.mark.parametrize('url', VALID_URLS)
+    def test_validate_url(self, url):
         """Test URL validation."""
-        # Valid URLs (note: the actual function rejects localhost for security)
-        valid_urls = [
-            'https://example.com',
-            'http://subdomain.example.co.uk/path',
-            'https://example.com/path?query=value',
-        ]
+        result, message = validate_url(url)
+        assert result == True, f"URL '{url}' should be valid: {message}"
+    
+    @pytest.mark.parametrize('url', INVALID_URLS)
+    def test_validate_url_invalid(self, url):
+        """Test invalid and unsafe URLs are rejected."""
+        result, message = validate_url(url)
+        assert result == False, f"URL '{url}' should be invalid: {message}"
+    
+    def test_validators_reject_oversized_input(self):
+        """Test adversarially long emails and URLs are rejected up front."""
+        assert validate_email('a' * 100 + '@' + 'a.' * 100 + 'com') == False
+        
+        result, message = validate_url('https://example.com/' + 'a' * 2048)
+        assert result == False
+        assert 'too long' in message
+    
+    def test_validate_url_is_cached(self):
+        """Test repeated URL validation is served from the cache."""
+        _validate_url.cache_clear()
         
-        for url in valid_urls:
-            result, message = validate_url(url)
-            assert result == True, f"URL '{url}' should be valid: {message}"
+        first = validate_url('https://example.com/feed')
+        second = validate_url('https://example.com/feed')
         
-        # Invalid URLs
-        invalid_urls = [
-            'not a url',
-            'javascript:alert(1)',
-            'data:text/html,<script>alert(1)</script>',
-            '//example.com',  # Missing protocol
-            'example.com',  # Missing protocol
-            'http://localhost:8080',  # Rejected by security check
-            'https://192.168.1.1',  # Rejected by security check
-            '',
-        ]
+        assert first == second
+        assert _validate_url.cache_info().hits == 1
         
-        for url in invalid_urls:
-            if not url:  # Skip empty string
-                continue
-            result, message = validate_url(url)
-            assert result == False, f"URL '{url}' should be invalid: {message}"
+        # Unhashable input is rejected before it reaches the cache
+        result, message = validate_url(['https://example.com/feed'])
+        assert result == False
 
 
 class TestValidationHelpers:
     """Test additional validation helper functions."""
     
-    def test_validate_search_query(self):
+    @pytest.mark.parametrize('query', VALID_QUERIES)
+    def test_validate_search_query(self, query):
         """Test search query validation."""
-        # Valid queries
-        valid_queries = [
-            'simple search',
-            'machine learning',
-            'search with numbers 123'
-        ]
-        
-        for query in valid_queries:
-            result, message = validate_search_query(query)
-            assert result == True, f"Query '{query}' should be valid: {message}"
-        
-        # Invalid queries
-        invalid_queries = [
-            'union select * from users',
-            '<script>alert(1)</script>',
-            'drop table documents',
-            '',
-            ' ' * 1001  # Too long
-        ]
-        
-        for query in invalid_queries:
-            result, message = validate_search_query(query)
-            assert result == False, f"Query '{query}' should be invalid: {message}"
+        result, message = validate_search_query(query)
+        assert result == True, f"Query '{query}' should be valid: {message}"
     
-    def test_validate_tag_name(self):
+    @pytest.mark.parametrize('query', INVALID_QUERIES)
+    def test_validate_search_query_invalid(self, query):
+        """Test empty, oversized and injection queries are rejected."""
+        result, message = validate_search_query(query)
+        assert result == False, f"Query '{query}' should be invalid: {message}"
+    
+    @pytest.mark.parametrize('tag', VALID_TAGS)
+    def test_validate_tag_name(self, tag):
         """Test tag name validation."""
-        # Valid tags
-        valid_tags = [
-            'technology',
-            'machine-learning',
-            'data_science',
-            'AI ML'
-        ]
-        
-        for tag in valid_tags:
-            result, message = validate_tag_name(tag)
-            assert result == True, f"Tag '{tag}' should be valid: {message}"
-        
-        # Invalid tags
-        invalid_tags = [
-            '',
-            'a',  # Too short
-            'a' * 51,  # Too long
-            '-starts-with-dash',
-            'ends-with-dash-',
-            'tag@special',  # Invalid character
-            'double  spaces'
-        ]
-        
-        for tag in invalid_tags:
-            result, message = validate_tag_name(tag)
-            assert result == False, f"Tag '{tag}' should be invalid: {message}"
+        result, message = validate_tag_name(tag)
+        assert result == True, f"Tag '{tag}' should be valid: {message}"
+    
+    @pytest.mark.parametrize('tag', INVALID_TAGS)
+    def test_validate_tag_name_invalid(self, tag):
+        """Test invalid tag names are rejected."""
+        result, message = validate_tag_name(tag)
+        assert result == False, f"Tag '{tag}' should be invalid: {message}"
 
 
 class TestFileValidation:
@@ -228,9 +250,6 @@ class TestFileValidation:
     
     def test_validate_file_upload(self):
         """Test file upload validation."""
-        allowed_extensions = {'txt', 'pdf', 'docx', 'csv'}
-        max_size = 1024 * 1024  # 1 MB
-        
         # Valid file
         valid_file = FileStorage(
             stream=io.BytesIO(b'content'),
@@ -240,8 +259,8 @@ class TestFileValidation:
         
         result, message = validate_file_upload(
             valid_file, 
-            allowed_extensions=allowed_extensions, 
-            max_size=max_size
+            allowed_extensions=ALLOWED_EXTENSIONS, 
+            max_size=MAX_UPLOAD_SIZE
         )
         assert result == True, f"Valid file should pass: {message}"
         
@@ -254,22 +273,22 @@ class TestFileValidation:
         
         result, message = validate_file_upload(
             invalid_file, 
-            allowed_extensions=allowed_extensions, 
-            max_size=max_size
+            allowed_extensions=ALLOWED_EXTENSIONS, 
+            max_size=MAX_UPLOAD_SIZE
         )
         assert result == False
         assert 'not allowed' in message
         
         # File too large
         large_file = FileStorage(
-            stream=io.BytesIO(b'x' * (max_size + 1)),
+            stream=io.BytesIO(bytes(MAX_UPLOAD_SIZE + 1)),  # Zero-filled; only the size matters
             filename='large.txt'
         )
         
         result, message = validate_file_upload(
             large_file, 
-            allowed_extensions=allowed_extensions, 
-            max_size=max_size
+            allowed_extensions=ALLOWED_EXTENSIONS, 
+            max_size=MAX_UPLOAD_SIZE
         )
         assert result == False
         assert 'too large' in message.lower()
@@ -278,6 +297,66 @@ class TestFileValidation:
         result, message = validate_file_upload(None)
         assert result == False
         assert 'no file' in message.lower()
+    
+    def test_validate_file_upload_content_length(self):
+        """Test the size check uses Content-Length for non-seekable streams."""
+        class NonSeekableStream(io.RawIOBase):
+            def readable(self):
+                return True
+            
+            def seekable(self):
+                return False
+        
+        large_file = FileStorage(
+            stream=NonSeekableStream(),
+            filename='large.txt',
+            content_length=MAX_UPLOAD_SIZE + 1
+        )
+        result, message = validate_file_upload(large_file, allowed_extensions=ALLOWED_EXTENSIONS, max_size=MAX_UPLOAD_SIZE)
+        assert result == False
+        assert 'too large' in message.lower()
+        
+        small_file = FileStorage(
+            stream=NonSeekableStream(),
+            filename='small.txt',
+            content_length=10
+        )
+        result, message = validate_file_upload(small_file, allowed_extensions=ALLOWED_EXTENSIONS, max_size=MAX_UPLOAD_SIZE)
+        assert result == True, f"Small file should pass: {message}"
+    
+    def test_validate_file_upload_understated_content_length(self):
+        """Test a declared Content-Length smaller than the payload is not trusted."""
+        large_file = FileStorage(
+            stream=io.BytesIO(bytes(MAX_UPLOAD_SIZE + 1)),
+            filename='large.txt',
+            content_length=10
+        )
+        result, message = validate_file_upload(large_file, allowed_extensions=ALLOWED_EXTENSIONS, max_size=MAX_UPLOAD_SIZE)
+        assert result == False
+        assert 'too large' in message.lower()
+
+
+class TestValidatorPerformance:
+    """
+    Benchmark the validator hot paths with pytest-benchmark.
+    
+    pytest-benchmark turns itself off under xdist (each benchmark then runs
+    once as a plain test); measure with `pytest -n 0 --benchmark-only`.
+    """
+    
+    @pytest.mark.parametrize('validator,value', [
+        (validate_email, 'user.name@subdomain.example.com'),
+        (validate_username, 'john_doe'),
+        (_validate_url, 'https://example.com/feed.xml'),
+        (validate_search_query, 'machine learning news'),
+        (validate_tag_name, 'machine-learning'),
+        (sanitize_html_content, '<p>Hello <strong>world</strong></p><script>alert(1)</script>'),
+    ], ids=lambda param: getattr(param, '__name__', None))
+    def test_validator_benchmark(self, benchmark, validator, value):
+        """Benchmark one validator call (memoized validators bypass their cache)."""
+        func = getattr(validator, '__wrapped__', validator)
+        
+        benchmark(func, value)
 
 
 # End of test file